@@ -0,0 +1,23 @@
+"""
+Benchmarks for PyMarvel. Run a benchmark module with, e.g.::
+
+    python -m benchmarks.memory
+
+or every benchmark, and compare two runs, with::
+
+    python -m benchmarks > current.json
+    python -m benchmarks compare baseline.json current.json
+
+Every benchmark prints its results as JSON.
+"""
+
+import timeit
+
+
+def per_call(func, number, repeat=5):
+    """
+    Times func, called number times in a row, repeat times.
+
+    :returns: float -- Best seconds per call
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
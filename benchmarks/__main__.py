@@ -0,0 +1,87 @@
+"""
+Runs every benchmark, or compares two runs.
+
+    python -m benchmarks [name ...] > current.json
+    python -m benchmarks compare baseline.json current.json [threshold]
+
+compare lists every metric that got worse by more than threshold
+(0.2 by default, i.e. 20%) and exits with status 1 if there is any.
+"""
+
+import json
+import platform
+import sys
+import time
+
+from benchmarks import calls, import_time, memory, models, paging
+
+BENCHMARKS = {
+    'calls': calls,
+    'import_time': import_time,
+    'memory': memory,
+    'models': models,
+    'paging': paging,
+}
+
+# Metrics where a larger value is better; all others are costs
+HIGHER_IS_BETTER = ('per_second', 'saved')
+
+
+def run(names=None):
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'benchmarks': {},
+    }
+    for name in names or sorted(BENCHMARKS):
+        results['benchmarks'][name] = BENCHMARKS[name].run()
+    return results
+
+
+def flatten(results, prefix=''):
+    metrics = {}
+    for key, value in results.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    :returns: list -- (metric, baseline value, current value, change) of the regressions
+    """
+    old = flatten(baseline['benchmarks'])
+    new = flatten(current['benchmarks'])
+    regressions = []
+    for name in sorted(set(old) & set(new)):
+        if not old[name]:
+            continue
+        change = (new[name] - old[name]) / float(old[name])
+        if any(word in name for word in HIGHER_IS_BETTER):
+            change = -change
+        if change > threshold:
+            regressions.append((name, old[name], new[name], change))
+    return regressions
+
+
+def main(args):
+    if args and args[0] == 'compare':
+        with open(args[1]) as f:
+            baseline = json.load(f)
+        with open(args[2]) as f:
+            current = json.load(f)
+        threshold = float(args[3]) if len(args) > 3 else 0.2
+        regressions = compare(baseline, current, threshold)
+        for name, old, new, change in regressions:
+            print('%s: %.4g -> %.4g (%+.0f%% worse)' % (name, old, new, change * 100))
+        return 1 if regressions else 0
+    print(json.dumps(run(args), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
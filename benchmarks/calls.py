@@ -0,0 +1,70 @@
+"""
+Calls per second through Marvel._call.
+
+"in_process" serves a canned 20-item page from a transport in the same
+process, so it measures the client alone: signing, cache keys, single
+flight and decoding. "http" calls a local StandInServer over HTTP with
+requests, on one thread and on a pool of workers.
+
+    python -m benchmarks.calls [calls]
+
+"""
+
+import json
+import sys
+import time
+
+from marvel import Marvel
+from marvel.standin import StandInServer, SyntheticData
+from marvel.transport import Transport, Response
+
+from benchmarks import per_call
+
+
+class CannedTransport(Transport):
+
+    """
+    Transport answering every call with the same response
+    """
+
+    def __init__(self, content):
+        self.content = content
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return Response(200, {}, self.content)
+
+
+def calls_per_second(m, calls, workers=1):
+    start = time.time()
+    if workers == 1:
+        for offset in range(calls):
+            m._call('comics', offset=offset % 100)
+    else:
+        m.map(lambda offset: m._call('comics', offset=offset % 100), range(calls), workers)
+    return calls / (time.time() - start)
+
+
+def run(calls=2000):
+    data = SyntheticData(scale=0.01)
+    page = {'code': 200, 'status': 'Ok', 'etag': 'etag', 'data': data.page('comics', 0, 20)}
+    m = Marvel('public', 'private', transport=CannedTransport(json.dumps(page).encode('utf-8')))
+    results = {
+        'calls': calls,
+        'in_process': {
+            'calls_per_second': 1 / per_call(lambda: m._call('comics', limit=20), calls),
+        },
+    }
+
+    with StandInServer(data) as server:
+        with Marvel('public', 'private', endpoint=server.endpoint, max_workers=8) as m:
+            m._call('comics')  # connect
+            results['http'] = {
+                'calls_per_second': calls_per_second(m, calls // 4),
+                'calls_per_second_8_workers': calls_per_second(m, calls // 4, workers=8),
+            }
+    return results
+
+
+if __name__ == '__main__':
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(json.dumps(run(calls), indent=2, sort_keys=True))
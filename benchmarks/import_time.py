@@ -0,0 +1,65 @@
+"""
+Import time of the marvel package.
+
+Times each scenario in a fresh interpreter, next to an empty one, and
+lists which of the tracked modules it loads. Importing marvel should load none of
+them; the HTTP stack only comes with the first call.
+
+    python -m benchmarks.import_time [repeat]
+
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SCENARIOS = [
+    ('import marvel', 'import marvel'),
+    ('from marvel import Marvel', 'from marvel import Marvel'),
+    ('Marvel()', "from marvel import Marvel; Marvel('public', 'private')"),
+    ('Marvel().transport', "from marvel import Marvel; Marvel('public', 'private').transport"),
+]
+
+# Modules whose import shows up in cold-start latency, and the client itself
+TRACKED_MODULES = ('requests', 'urllib3', 'sqlite3', 'concurrent.futures', 'orjson', 'ujson',
+                 'marvel.marvel', 'marvel.structures', 'marvel.comic')
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+print('%%r %%s' %% (elapsed, ','.join(sorted(sys.modules))))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(code, repeat):
+    times = []
+    modules = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT % code], cwd=ROOT)
+        elapsed, modules = output.decode('utf-8').split(' ', 1)
+        times.append(float(elapsed))
+        modules = modules.strip().split(',')
+    times.sort()
+    return {
+        'median_ms': times[len(times) // 2] * 1000,
+        'min_ms': times[0] * 1000,
+        'loaded_modules': [name for name in TRACKED_MODULES if name in modules],
+    }
+
+
+def run(repeat=20):
+    results = {'repeat': repeat, 'python': sys.version.split()[0],
+               'baseline': measure('pass', repeat), 'scenarios': {}}
+    for name, code in SCENARIOS:
+        results['scenarios'][name] = measure(code, repeat)
+    return results
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(json.dumps(run(repeat), indent=2, sort_keys=True))
@@ -0,0 +1,60 @@
+"""
+Per-object memory of model instances.
+
+Builds many Comic, Story and summary instances over shared response dicts
+and reports the bytes each one costs, next to an object with the
+__dict__ based layout MarvelObject used before it had __slots__.
+
+    python -m benchmarks.memory [count]
+
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from marvel.comic import Comic
+from marvel.story import Story
+from marvel.summaries import ComicSummary, CharacterSummary
+
+
+class DictLayout(object):
+
+    """
+    MarvelObject layout without __slots__
+    """
+
+    def __init__(self, marvel, response, **params):
+        self.marvel = marvel
+        self.dict = response or dict()
+        self.params = params or dict()
+
+
+def bytes_per_object(factory, response, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(None, response) for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return float(size) / count
+
+
+def run(count=100000):
+    response = {'id': 1, 'title': 'Comic', 'resourceURI': 'http://gateway.marvel.com/v1/public/comics/1'}
+    baseline = bytes_per_object(DictLayout, response, count)
+    results = {'count': count, 'baseline_bytes': baseline, 'classes': {}}
+    for cls in (Comic, Story, ComicSummary, CharacterSummary):
+        size = bytes_per_object(cls, response, count)
+        results['classes'][cls.__name__] = {
+            'bytes': size,
+            'saved_bytes': baseline - size,
+            'saved_ratio': 1 - size / baseline,
+        }
+    return results
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(json.dumps(run(count), indent=2, sort_keys=True))
@@ -0,0 +1,73 @@
+"""
+Cost of building and reading models.
+
+Times DataContainer.results on 20 and 100-item pages of synthetic
+comics, then the first access of str_to_datetime, Summary.id and the
+nested ListWrapper.items of fresh instances.
+
+    python -m benchmarks.models [number]
+
+"""
+
+import json
+import sys
+
+from marvel.comic import ComicDataWrapper
+from marvel.standin import SyntheticData
+from marvel.structures import DataContainer
+from marvel.summaries import CharacterSummary
+from marvel.comic import Comic
+
+from benchmarks import per_call
+
+
+class _Client(object):
+
+    """
+    Stands in for Marvel as the owner of wrappers; never called
+    """
+
+    identity_map = None
+
+    def get_comics(self, **kwargs):
+        raise NotImplementedError
+
+
+def page_response(size):
+    data = SyntheticData(scale=0.1, related=20)
+    return {'code': 200, 'status': 'Ok', 'data': data.page('comics', 0, size)}
+
+
+def run(number=200):
+    client = _Client()
+    results = {'number': number, 'results': {}, 'properties': {}}
+    for size in (20, 100):
+        response = page_response(size)
+        seconds = per_call(
+            lambda: DataContainer(client, response['data'], Comic).results, number)
+        wrapper_seconds = per_call(
+            lambda: ComicDataWrapper(client, response).data.results, number)
+        results['results']['%s_items' % size] = {
+            'page_us': seconds * 1e6,
+            'item_us': seconds * 1e6 / size,
+            'wrapper_page_us': wrapper_seconds * 1e6,
+        }
+
+    comic_dict = page_response(1)['data']['results'][0]
+    summary_dict = comic_dict['characters']['items'][0]
+    calls = number * 50
+    results['properties'] = {
+        'str_to_datetime_us': per_call(
+            lambda: Comic(client, comic_dict).str_to_datetime(comic_dict['modified']), calls) * 1e6,
+        'modified_first_access_us': per_call(
+            lambda: Comic(client, comic_dict).modified, calls) * 1e6,
+        'summary_id_us': per_call(lambda: CharacterSummary(client, summary_dict).id, calls) * 1e6,
+        'list_wrapper_items_us': per_call(
+            lambda: Comic(client, comic_dict).characters.items, calls) * 1e6,
+    }
+    return results
+
+
+if __name__ == '__main__':
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(json.dumps(run(number), indent=2, sort_keys=True))
@@ -0,0 +1,46 @@
+"""
+Throughput and peak memory of reading a whole collection.
+
+Reads every synthetic comic from a local StandInServer with
+fetch_all(), which holds every result, and iter_results(), which holds
+a few pages at a time, and reports items per second and the peak of
+traced memory.
+
+    python -m benchmarks.paging [total]
+
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from marvel import Marvel
+from marvel.standin import StandInServer, SyntheticData
+
+
+def measure(read):
+    tracemalloc.start()
+    start = time.time()
+    count = read()
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'items': count, 'items_per_second': count / elapsed, 'peak_bytes': peak}
+
+
+def run(total=5000):
+    data = SyntheticData(totals={'comics': total, 'characters': 1500, 'creators': 5000,
+                                 'events': 75, 'series': 12000, 'stories': 100000})
+    with StandInServer(data) as server:
+        with Marvel('public', 'private', endpoint=server.endpoint, max_workers=8) as m:
+            m.get_comics(limit=1)  # connect
+            fetch_all = measure(lambda: len(m.get_comics(limit=100).fetch_all(workers=8)))
+            iter_results = measure(
+                lambda: sum(1 for _ in m.get_comics(limit=100).iter_results(prefetch=4)))
+    return {'total': total, 'fetch_all': fetch_all, 'iter_results': iter_results}
+
+
+if __name__ == '__main__':
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(json.dumps(run(total), indent=2, sort_keys=True))
@@ -2,4 +2,20 @@ __title__ = 'PyMarvel'
 __author__ = 'Garrett Pennington'
 __license__ = 'MIT'
 
-from .marvel import Marvel
\ No newline at end of file
+import sys
+
+__all__ = ['Marvel']
+
+if sys.version_info < (3, 7):
+    from .marvel import Marvel
+else:
+    # Marvel is imported on first access (PEP 562), so that importing
+    # the package does not load the client and its dependencies.
+    def __getattr__(name):
+        if name == 'Marvel':
+            from .marvel import Marvel
+            return Marvel
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + __all__)
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio client for the Marvel API. Requires Python 3 and aiohttp.
+"""
+
+import asyncio
+import functools
+from collections import deque
+
+from .marvel import Marvel
+from .metrics import CallEvent, clock
+from .transport import Response, DEFAULT_TIMEOUT
+
+
+def query_pairs(params):
+    """
+    Turns query params into (name, value) string pairs, as aiohttp takes
+    neither bools nor lists. Like requests, list values are sent as
+    repeated params in their order, and None values are left out.
+
+    >>> query_pairs({'orderBy': ['name', '-modified'], 'hasDigitalIssue': True})
+    [('orderBy', 'name'), ('orderBy', '-modified'), ('hasDigitalIssue', 'true')]
+
+    :returns: list
+    """
+    pairs = []
+    for name, value in (params or {}).items():
+        if isinstance(value, (set, frozenset)):
+            values = sorted(value)
+        elif isinstance(value, (list, tuple)):
+            values = value
+        else:
+            values = [value]
+        for value in values:
+            if isinstance(value, bool):
+                pairs.append((name, 'true' if value else 'false'))
+            elif value is not None:
+                pairs.append((name, '%s' % value))
+    return pairs
+
+
+class AsyncTransport(object):
+
+    """
+    Base asyncio Transport
+
+    Same contract as marvel.transport.Transport, with awaitable get() and close().
+    """
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(AsyncTransport):
+
+    """
+    Transport backed by a pooled aiohttp.ClientSession
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, keep_alive=True, timeout=DEFAULT_TIMEOUT):
+        """
+        :param limit: Maximum number of simultaneous connections
+        :type limit: int
+        :param limit_per_host: Maximum number of simultaneous connections per host, 0 for no limit
+        :type limit_per_host: int
+        :param keep_alive: Reuse connections between calls
+        :type keep_alive: bool
+        :param timeout: Default (connect, read) timeout in seconds
+        :type timeout: tuple
+        """
+        import aiohttp
+        self._aiohttp = aiohttp
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._session = None
+
+    def _client_timeout(self, timeout):
+        connect, read = timeout or self.timeout
+        return self._aiohttp.ClientTimeout(connect=connect, sock_read=read)
+
+    @property
+    def session(self):
+        # Sessions must be created inside a running event loop
+        if self._session is None or self._session.closed:
+            connector = self._aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host,
+                force_close=not self.keep_alive)
+            self._session = self._aiohttp.ClientSession(connector=connector,
+                                                        trace_configs=[self._trace_config()])
+        return self._session
+
+    def _trace_config(self):
+        # Times DNS resolution and new connections into the timings dict
+        # passed as trace_request_ctx; pooled connections skip both
+        trace = self._aiohttp.TraceConfig()
+        for phase, signal in (('dns', 'dns_resolvehost'), ('connect', 'connection_create')):
+            getattr(trace, 'on_%s_start' % signal).append(self._timer(phase, True))
+            getattr(trace, 'on_%s_end' % signal).append(self._timer(phase, False))
+        return trace
+
+    def _timer(self, phase, start):
+        async def record(session, context, params):
+            timings = context.trace_request_ctx
+            if start:
+                timings[phase] = clock()
+            else:
+                timings[phase] = clock() - timings[phase]
+        return record
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        timings = {}
+        start = clock()
+        try:
+            async with self.session.get(url, params=query_pairs(params), headers=headers, trace_request_ctx=timings,
+                                        timeout=self._client_timeout(timeout)) as response:
+                timings['ttfb'] = clock() - start
+                content = await response.read()
+                return Response(response.status, response.headers, content, timings)
+        except (self._aiohttp.ClientError, asyncio.TimeoutError) as error:
+            # Same family as requests' errors, so RetryPolicy retries them
+            raise IOError(error)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class AsyncMarvel(Marvel):
+
+    """Marvel API asyncio class
+
+    Every get_* method of Marvel is a coroutine here and returns the same
+    DataWrapper types. DataWrapper.next()/previous() and the related
+    resource helpers (DataItem.get_comics(), etc.) become awaitable.
+
+    >>> async with AsyncMarvel(public_key, private_key) as m:
+    ...     cdw = await m.get_character(1009718)
+    ...     comics = await cdw.data.result.get_comics()
+    ...     more = await comics.next()
+
+    Use it with async with, or await close(). When the cache or the daily
+    budget does disk I/O (SQLiteCache, DailyBudget with a path), cache
+    lookups, cache writes and budget updates run in the loop's default
+    executor instead of blocking the event loop.
+
+    """
+
+    def __init__(self, public_key, private_key, transport=None, **kwargs):
+        """
+        :param transport: Transport used for every call. Defaults to AiohttpTransport()
+        :type transport: marvel.aio.AsyncTransport
+        :param kwargs: Other options of Marvel (cache, rate_limiter, ...)
+        """
+        super(AsyncMarvel, self).__init__(
+            public_key, private_key, transport=transport or AiohttpTransport(), **kwargs)
+        self._flights = {}
+
+    async def _call(self, resource_url, **params):
+        return await self._observe(await self._offload(self._prepare, resource_url, params))
+
+    async def get_raw(self, resource_url, **params):
+        return await self._observe(await self._offload(self._prepare, resource_url, params, raw=True))
+
+    async def _offload(self, fn, *args, **kwargs):
+        """
+        Runs fn in the default executor if the cache or the budget blocks
+        on disk I/O, in the event loop otherwise.
+        """
+        if getattr(self.cache, 'blocking', False) or getattr(self.budget, 'path', None) is not None:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, functools.partial(fn, *args, **kwargs))
+        return fn(*args, **kwargs)
+
+    async def _observe(self, call):
+        if not self.on_call:
+            return await self._execute(call)
+        start = clock()
+        try:
+            body = await self._execute(call)
+        except Exception as error:
+            self._emit(CallEvent(call, clock() - start, error=error))
+            raise
+        self._emit(CallEvent(call, clock() - start, body=body))
+        return body
+
+    async def _execute(self, call):
+        if call.body is not None:
+            return call.body
+        if self.single_flight is None or call.raw:
+            return await self._send(call)
+
+        # Identical concurrent calls await the same task, shielded so that
+        # a cancelled caller does not cancel it for the others
+        task = self._flights.get(call.key)
+        if task is None:
+            task = self._flights[call.key] = asyncio.ensure_future(self._shared(call))
+            task.add_done_callback(lambda _: self._flights.pop(call.key, None))
+        body, call.response = await asyncio.shield(task)
+        return body
+
+    async def _shared(self, call):
+        return await self._send(call), call.response
+
+    async def _send(self, call):
+        while True:
+            call.attempts += 1
+            wait = await self._offload(self._reserve)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                response = call.response = await self.transport.get(call.url, params=call.params,
+                                                                    headers=call.headers)
+                delay = self._retry_delay(call, response=response)
+                if delay is None:
+                    return await self._offload(self._finish, call, response)
+            except Exception as error:
+                delay = self._retry_delay(call, error=error)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _get(self, wrapper_class, resource_url, params, **kwargs):
+        response = await self._call(resource_url, **params)
+        return wrapper_class(self, response, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedules the coroutine fn(*args, **kwargs) as a task.
+
+        :returns:  asyncio.Task
+        """
+        return asyncio.ensure_future(fn(*args, **kwargs))
+
+    async def map(self, fn, iterable, workers=None):
+        """
+        Awaits fn on every item of iterable, with at most workers running at once.
+
+        :returns:  list -- Results of fn, in the order of iterable
+        """
+        semaphore = asyncio.Semaphore(workers or self.max_workers)
+
+        async def run(item):
+            async with semaphore:
+                return await fn(item)
+
+        return await asyncio.gather(*[run(item) for item in iterable])
+
+    async def _fetch_all(self, wrapper, pages, workers):
+        results = list(self._page_results(wrapper))
+        for page in await self.map(lambda params: wrapper.getter(**params), pages, workers):
+            results.extend(self._page_results(page))
+        return results
+
+    async def _fetch_columns(self, wrapper, pages, fields, workers, backend):
+        from .columns import pages_to_columns
+        pages = await self.map(lambda params: wrapper.getter(**params), pages, workers)
+        return pages_to_columns([wrapper] + pages, fields, backend)
+
+    async def _iter_results(self, wrapper, pages, prefetch):
+        pages = iter(pages)
+        pending = deque()
+        try:
+            for params in pages:
+                pending.append(asyncio.ensure_future(wrapper.getter(**params)))
+                if len(pending) == prefetch:
+                    break
+            for item in self._page_results(wrapper):
+                yield item
+            while pending:
+                page = await pending.popleft()
+                for params in pages:
+                    pending.append(asyncio.ensure_future(wrapper.getter(**params)))
+                    break
+                for item in self._page_results(page):
+                    yield item
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def iter_results(self, method, prefetch=2, **kwargs):
+        wrapper = await method(**kwargs)
+        async for item in wrapper.iter_results(prefetch):
+            yield item
+
+    async def _get_by_ids(self, resource, getter, ids, workers):
+        result, ids = self._known_ids(resource, ids)
+        return self._batch_result(ids, await self.map(getter, ids, workers), result)
+
+    async def _result(self, value):
+        return value
+
+    async def close(self):
+        await self.transport.close()
+
+    def __enter__(self):
+        raise TypeError("AsyncMarvel closes its transport asynchronously, use 'async with' instead of 'with'")
+
+    def __exit__(self, *exc_info):
+        raise TypeError("AsyncMarvel closes its transport asynchronously, use 'async with' instead of 'with'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
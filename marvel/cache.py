@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import threading
+from collections import namedtuple, OrderedDict
+
+try:
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlencode
+
+
+# Params that change on every call and must not be part of a cache key
+AUTH_PARAMS = ('ts', 'apikey', 'hash')
+
+CacheEntry = namedtuple('CacheEntry', ['body', 'etag', 'stored_at'])
+
+
+def normalize_param(value):
+    """
+    Normalizes a query param value so equivalent calls share a cache key.
+    Lists keep their order, which matters for params such as orderBy;
+    only sets are sorted.
+
+    :returns: str
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (set, frozenset)):
+        return ','.join(sorted(normalize_param(v) for v in value))
+    if isinstance(value, (list, tuple)):
+        return ','.join(normalize_param(v) for v in value)
+    return '%s' % value
+
+
+def cache_key(resource_url, params):
+    """
+    Builds a cache key from a resource url and its query params.
+    Auth params are ignored and params are sorted.
+
+    >>> cache_key('characters', {'limit': 10, 'orderBy': 'name'})
+    'characters?limit=10&orderBy=name'
+
+    :param resource_url: url slug of the resource
+    :type resource_url: str
+    :param params: query params of the call
+    :type params: dict
+
+    :returns: str
+    """
+    items = sorted((k, normalize_param(v)) for k, v in params.items()
+                   if k not in AUTH_PARAMS and v is not None)
+    if not items:
+        return resource_url
+    return "%s?%s" % (resource_url, urlencode(items))
+
+
+class BaseCache(object):
+
+    """
+    Base response cache
+
+    Child classes implement storage: get(), set(), touch(), delete() and clear().
+    Entries younger than their TTL are served without calling the API,
+    older entries are revalidated with their etag.
+    """
+
+    # True if storage calls block on disk or network I/O; AsyncMarvel
+    # then runs them off the event loop
+    blocking = False
+
+    def __init__(self, ttl=None, default_ttl=0):
+        """
+        :param ttl: Seconds an entry stays fresh, per resource type (e.g. {'stories': 86400}). \
+            May also be a callable taking (resource_url, params) and returning seconds.
+        :type ttl: dict
+        :param default_ttl: Seconds an entry stays fresh for resource types missing from ttl
+        :type default_ttl: int
+        """
+        self.ttl = ttl or dict()
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, resource_url, params):
+        """
+        :returns: int -- Seconds a response for this call stays fresh
+        """
+        if callable(self.ttl):
+            return self.ttl(resource_url, params)
+        return self.ttl.get(resource_url.split('/')[0], self.default_ttl)
+
+    def is_fresh(self, entry, resource_url, params):
+        """
+        :returns: bool -- True if the entry can be served without revalidation
+        """
+        ttl = self.ttl_for(resource_url, params)
+        return bool(ttl) and time.time() - entry.stored_at < ttl
+
+
+class ResponseCache(BaseCache):
+
+    """
+    In-memory response cache
+
+    Stores decoded responses with their etag. Marvel._call sends the etag
+    as If-None-Match and serves the stored body on a 304 Not Modified.
+
+    >>> m = Marvel(public_key, private_key, cache=ResponseCache(maxsize=1000))
+
+    """
+
+    def __init__(self, maxsize=None, ttl=None, default_ttl=0):
+        """
+        :param maxsize: Maximum number of entries, least recently used are evicted first. None for no limit.
+        :type maxsize: int
+        """
+        super(ResponseCache, self).__init__(ttl, default_ttl)
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :returns: CacheEntry or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, body, etag=None, content=None):
+        """
+        Stores a decoded response.
+
+        :param key: Key created by cache_key()
+        :type key: str
+        :param body: Decoded json response
+        :type body: dict
+        :param etag: Digest of the response
+        :type etag: str
+        :param content: Raw json of body, kept by caches that serialize entries
+        :type content: bytes
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = CacheEntry(body, etag, time.time())
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        """
+        Marks a revalidated entry as fresh again.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry._replace(stored_at=time.time())
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+class SQLiteCache(BaseCache):
+
+    """
+    Persistent response cache stored in a SQLite database
+
+    Survives process restarts. Once the stored bodies exceed max_bytes,
+    least recently used entries are evicted. Raw response bodies are
+    stored as they came, and decoded with decoder when read.
+
+    >>> cache = SQLiteCache('marvel.db', ttl={'stories': 7 * 86400, 'comics': 3600}, max_bytes=512 * 2 ** 20)
+    >>> m = Marvel(public_key, private_key, cache=cache)
+
+    """
+
+    blocking = True
+
+    def __init__(self, path, ttl=None, default_ttl=0, max_bytes=None, decoder=None):
+        """
+        :param path: Path of the database file
+        :type path: str
+        :param max_bytes: Byte budget for stored bodies. None for no limit.
+        :type max_bytes: int
+        :param decoder: json decoder, see marvel.decoder.get_decoder()
+        :type decoder: str
+        """
+        import sqlite3
+        from .decoder import get_decoder
+        super(SQLiteCache, self).__init__(ttl, default_ttl)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.decoder = get_decoder(decoder)
+        self._sqlite3 = sqlite3
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+        """)
+
+    def get(self, key):
+        """
+        :returns: CacheEntry or None
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT body, etag, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        body = row[0]
+        if not isinstance(body, (bytes, type(u''))):
+            # Blobs are read back as buffers on Python 2
+            body = bytes(body)
+        return CacheEntry(self.decoder(body), row[1], row[2])
+
+    def set(self, key, body, etag=None, content=None):
+        """
+        Stores a response, as content if given, and evicts least recently
+        used entries if the byte budget is exceeded.
+        """
+        if content is not None:
+            data = self._sqlite3.Binary(content)
+        else:
+            data = json.dumps(body)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, data, len(data), now, now))
+            if self.max_bytes is not None:
+                self._evict()
+
+    def _evict(self):
+        size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        expired = []
+        for key, entry_size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at, rowid"):
+            if size <= self.max_bytes:
+                break
+            expired.append((key,))
+            size -= entry_size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", expired)
+
+    def touch(self, key):
+        """
+        Marks a revalidated entry as fresh again.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def delete(self, key):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
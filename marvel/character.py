@@ -8,6 +8,8 @@ from .structures import DataItem, DataWrapper
 
 class CharacterDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(CharacterDataWrapper, self).__init__(marvel, response, **params)
 
@@ -21,6 +23,7 @@ class Character(DataItem):
     Character object
     Takes a dict of character attrs
     """
+    __slots__ = ()
     _resource_url = 'characters'
 
     @property
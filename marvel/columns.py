@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+
+from .core import FixedOffset, parse_datetime, parse_timezone
+from .exceptions import ApiError
+from .structures import DataWrapper
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    pyarrow = None
+
+NAN = float('nan')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=FixedOffset(0))
+
+# Typecode of the 64-bit integer arrays, 'q' is missing before Python 3.3
+try:
+    INT_TYPECODE = array('q').typecode
+except ValueError:
+    INT_TYPECODE = 'l'
+
+# Types of the fields whose type can't be told from their first value
+FIELD_TYPES = {
+    'id': 'int',
+    'digitalId': 'int',
+    'pageCount': 'int',
+    'startYear': 'int',
+    'endYear': 'int',
+    'issueNumber': 'float',
+    'modified': 'datetime',
+    'start': 'datetime',
+    'end': 'datetime',
+    'dates': 'datetime',
+    'prices': 'float',
+}
+
+
+def field_value(result, path):
+    """
+    Reads a field from a result dict. path is a field name split on dots;
+    in lists of typed values, such as prices or dates, a name selects the
+    value of that type.
+
+    >>> field_value(comic, ['prices', 'printPrice'])
+    2.99
+
+    :returns: Value, None if missing
+    """
+    value = result
+    for name in path:
+        if isinstance(value, dict):
+            value = value.get(name)
+        elif isinstance(value, list):
+            typed = [v for v in value if isinstance(v, dict) and v.get('type') == name]
+            value = typed[0].get('price', typed[0].get('date')) if typed else None
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+def field_type(field, values):
+    """
+    :returns: str -- 'int', 'float', 'bool', 'datetime' or 'str'
+    """
+    name = field.split('.')[0]
+    if name in FIELD_TYPES:
+        return FIELD_TYPES[name]
+    for value in values:
+        if isinstance(value, bool):
+            return 'bool'
+        if isinstance(value, int):
+            return 'int'
+        if isinstance(value, float):
+            return 'float'
+        if value is not None:
+            break
+    return 'str'
+
+
+def _valid_date(value):
+    # Placeholder dates such as '-0001-11-30T00:00:00-0500' are missing values
+    return bool(value) and value[:1] != '-'
+
+
+def _iso_date(value):
+    """
+    Rewrites a valid date as '2013-11-20T17:40:18-0500'. Event start and
+    end dates such as '1989-12-10 00:00:00' are taken as UTC, as with
+    parse_datetime().
+
+    :returns: str -- None for missing values
+    """
+    if not _valid_date(value):
+        return None
+    return '%sT%s%s' % (value[:10], value[11:19], (value[19:] or '+0000').replace(':', ''))
+
+
+def _numpy_column(values, kind):
+    if kind == 'int' and None not in values:
+        return numpy.array(values, dtype=numpy.int64)
+    if kind in ('int', 'float'):
+        return numpy.array([NAN if v is None else v for v in values], dtype=numpy.float64)
+    if kind == 'bool':
+        return numpy.array(values, dtype=bool)
+    if kind == 'datetime':
+        dates = [_iso_date(v) for v in values]
+        local = numpy.array([d[:19] if d else 'NaT' for d in dates], dtype='datetime64[s]')
+        offsets = numpy.array([parse_timezone(d[19:]).minutes if d else 0 for d in dates],
+                              dtype='timedelta64[m]')
+        return local - offsets
+    return numpy.array(values, dtype=object)
+
+
+def _arrow_column(values, kind):
+    if kind == 'datetime':
+        strings = pyarrow.array([_iso_date(v) for v in values], pyarrow.string())
+        return pyarrow.compute.strptime(strings, format='%Y-%m-%dT%H:%M:%S%z', unit='s',
+                                        error_is_null=True)
+    types = {'int': pyarrow.int64(), 'float': pyarrow.float64(),
+             'bool': pyarrow.bool_(), 'str': pyarrow.string()}
+    return pyarrow.array(values, types[kind])
+
+
+def _array_column(values, kind):
+    if kind == 'int' and None not in values:
+        return array(INT_TYPECODE, values)
+    if kind in ('int', 'float'):
+        return array('d', [NAN if v is None else v for v in values])
+    if kind == 'bool':
+        return array('b', [bool(v) for v in values])
+    if kind == 'datetime':
+        # POSIX timestamps
+        return array('d', [(parse_datetime(v) - EPOCH).total_seconds() if _valid_date(v) else NAN
+                           for v in values])
+    return list(values)
+
+
+BACKENDS = {
+    'numpy': _numpy_column,
+    'arrow': _arrow_column,
+    'array': _array_column,
+}
+
+
+def default_backend():
+    """
+    :returns: str -- 'numpy' or 'arrow' if installed, 'array' otherwise
+    """
+    if numpy is not None:
+        return 'numpy'
+    if pyarrow is not None:
+        return 'arrow'
+    return 'array'
+
+
+def to_columns(results, fields, backend=None):
+    """
+    Builds one typed array per field straight from result dicts,
+    without creating resource instances.
+
+    Missing values are nulls with Arrow; with NumPy and the stdlib
+    fallback, integer fields with missing values become floats with NaN.
+    Datetimes are datetime64[s] in UTC with NumPy, timestamp[s, UTC] with
+    Arrow and POSIX timestamps in an array('d') with the stdlib fallback,
+    where strings are plain lists.
+
+    >>> columns = to_columns(cdw.dict['data']['results'], ['id', 'pageCount', 'prices.printPrice'])
+
+    :param results: Result dicts, as in the 'results' of a response
+    :type results: list
+    :param fields: Field names, dotted for nested fields (e.g. 'series.name', \
+        'prices.printPrice'). A dict maps field names to 'int', 'float', 'bool', 'datetime' or 'str'.
+    :type fields: list
+    :param backend: 'numpy', 'arrow' or 'array', see default_backend()
+    :type backend: str
+
+    :returns: OrderedDict -- Arrays keyed by field
+    """
+    backend = backend or default_backend()
+    if backend == 'numpy' and numpy is None or backend == 'arrow' and pyarrow is None:
+        raise ImportError("%s is not installed" % backend)
+    build = BACKENDS[backend]
+    kinds = fields if isinstance(fields, dict) else {}
+    columns = OrderedDict()
+    for field in fields:
+        path = field.split('.')
+        values = [field_value(result, path) for result in results]
+        columns[field] = build(values, kinds.get(field) or field_type(field, values))
+    return columns
+
+
+def pages_to_columns(pages, fields, backend=None):
+    """
+    Builds columns from the results of several pages.
+
+    :param pages: DataWrapper or DataContainer instances
+    :type pages: list
+
+    :returns: OrderedDict -- Arrays keyed by field
+    """
+    results = []
+    for page in pages:
+        response = page.dict
+        if isinstance(page, DataWrapper):
+            if page.code != 200:
+                raise ApiError(page.code, page.status or page.dict.get('message'))
+            response = response['data']
+        results.extend(response.get('results') or [])
+    return to_columns(results, fields, backend)
@@ -3,13 +3,15 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
-from .core import MarvelObject
+from .core import MarvelObject, cached_property
 from .structures import DataWrapper, DataItem, TextObject, Image
 from .summaries import ComicSummary
 
 
 class ComicDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(ComicDataWrapper, self).__init__(marvel, response, **params)
 
@@ -25,6 +27,7 @@ class Comic(DataItem):
     :param dict: Dict of object, created from json response.
     :type dict: dict    
     """
+    __slots__ = ()
     _resource_url = 'comics'
 
     @property
@@ -71,7 +74,7 @@ class Comic(DataItem):
     def pageCount(self):
         return int(self.dict['pageCount'])
 
-    @property
+    @cached_property
     def textObjects(self):
         """
         :returns: list -- List of TextObjects
@@ -86,40 +89,45 @@ class Comic(DataItem):
     def series(self):
         return self.dict['series']
 
-    @property
+    @cached_property
     def variants(self):
         """
         Returns List of ComicSummary objects
         """
         return self.list_to_instance_list(self.dict['variants'], ComicSummary)
 
-    @property
+    @cached_property
     def collections(self):
         """
         Returns List of ComicSummary objects
         """
         return self.list_to_instance_list(self.dict['collections'], ComicSummary)
 
-    @property
+    @cached_property
     def collectedIssues(self):
         """
         Returns List of ComicSummary objects
         """
         return self.list_to_instance_list(self.dict['collectedIssues'], ComicSummary)
 
-    @property
+    @cached_property
     def dates(self):
         return self.list_to_instance_list(self.dict['dates'], ComicDate)
 
-    @property
+    def _prime_datetimes(self, parse):
+        super(Comic, self)._prime_datetimes(parse)
+        for date in self.dates if 'dates' in self.dict else ():
+            date._prime_datetimes(parse)
+
+    @cached_property
     def prices(self):
         return self.list_to_instance_list(self.dict['prices'], ComicPrice)
 
-    @property
+    @cached_property
     def thumbnail(self):
         return Image(self.marvel, self.dict['thumbnail'])
 
-    @property
+    @cached_property
     def images(self):
         return self.list_to_instance_list(self.dict['images'], Image)
 
@@ -136,11 +144,14 @@ class ComicDate(MarvelObject):
     """
     ComicDate object
     """
+    __slots__ = ()
+    _datetime_fields = ('date',)
+
     @property
     def type(self):
         return self.dict['type']
 
-    @property
+    @cached_property
     def date(self):
         return self.str_to_datetime(self.dict['date'])
 
@@ -154,6 +165,8 @@ class ComicPrice(MarvelObject):
     """
     ComicPrice object
     """
+    __slots__ = ()
+
     @property
     def type(self):
         return self.dict['type']
@@ -3,14 +3,116 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
-from datetime import datetime
+from datetime import datetime, timedelta, tzinfo
+
+
+class FixedOffset(tzinfo):
+
+    """
+    Fixed UTC offset, as found in Marvel timestamps (e.g. -0500)
+    """
+
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self._offset = timedelta(minutes=minutes)
+        sign = '-' if minutes < 0 else '+'
+        self._name = '%s%02d%02d' % (sign, abs(minutes) // 60, abs(minutes) % 60)
+
+    def utcoffset(self, dt):
+        return self._offset
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return self._name
+
+    def __getinitargs__(self):
+        return (self.minutes,)
+
+    def __repr__(self):
+        return 'FixedOffset(%d)' % self.minutes
+
+
+_TIMEZONES = {}
+
+
+def parse_timezone(_str):
+    """
+    Converts '-0500' or '-05:00' to a FixedOffset. Instances are shared.
+
+    :returns: FixedOffset
+    """
+    try:
+        return _TIMEZONES[_str]
+    except KeyError:
+        digits = _str[1:].replace(':', '')
+        if _str[:1] not in '+-' or len(digits) != 4 or not digits.isdigit():
+            raise ValueError("invalid UTC offset %r" % _str)
+        minutes = int(digits[:2]) * 60 + int(digits[2:])
+        tz = _TIMEZONES[_str] = FixedOffset(-minutes if _str[0] == '-' else minutes)
+        return tz
+
+
+def parse_datetime(_str):
+    """
+    Converts '2013-11-20T17:40:18-0500' format to a timezone aware 'datetime' object.
+    Reads the fixed positions of the format instead of using strptime.
+
+    Event start and end dates come as '1989-12-10 00:00:00', with a space
+    and no UTC offset; dates without an offset are taken as UTC.
+
+    :returns: datetime
+    """
+    try:
+        if _str[10] not in 'T ':
+            raise ValueError
+        return datetime(int(_str[0:4]), int(_str[5:7]), int(_str[8:10]),
+                        int(_str[11:13]), int(_str[14:16]), int(_str[17:19]),
+                        tzinfo=parse_timezone(_str[19:] or '+0000'))
+    except (ValueError, TypeError, IndexError):
+        raise ValueError("time data %r does not match format '%%Y-%%m-%%dT%%H:%%M:%%S%%z'" % (_str,))
+
+
+class cached_property(object):
+
+    """
+    Property computed on first access and then stored in the instance's
+    _cache slot, so nested objects (DataContainer, results, ListWrapper, ...)
+    are built once.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        cache = obj._cache
+        if cache is None:
+            cache = obj._cache = {}
+        try:
+            return cache[self.__name__]
+        except KeyError:
+            value = cache[self.__name__] = self.func(obj)
+            return value
 
 
 class MarvelObject(object):
 
     """
     Base class for all Marvel API classes
+
+    Instances use __slots__ instead of a per-instance __dict__, as large
+    result sets hold many of them. Memoized values live in _cache and
+    empty params are not stored.
     """
+    __slots__ = ('marvel', 'dict', '_params', '_cache')
+
+    # timestamp fields of the response, parsed into datetime properties of the same name
+    _datetime_fields = ()
 
     def __init__(self, marvel, response, **params):
         """
@@ -24,7 +126,15 @@ class MarvelObject(object):
         """
         self.marvel = marvel
         self.dict = response or dict()
-        self.params = params or dict()
+        self._params = params or None
+        self._cache = None
+
+    @property
+    def params(self):
+        """
+        :returns: dict -- Query params sent to the original API call
+        """
+        return self._params or dict()
 
     def __unicode__(self):
         """
@@ -93,9 +203,35 @@ class MarvelObject(object):
 
     def str_to_datetime(self, _str):
         """
-        Converts '2013-11-20T17:40:18-0500' format to 'datetime' object
+        Converts '2013-11-20T17:40:18-0500' format to a timezone aware 'datetime' object,
+        see parse_datetime()
 
         :returns: datetime
         """
-        # Hacked off %z timezone because reasons
-        return datetime.strptime(_str[:-5], '%Y-%m-%dT%H:%M:%S')
+        return parse_datetime(_str)
+
+    def _prime_datetimes(self, parse):
+        """
+        Parses the _datetime_fields of this object with parse and
+        caches them as the values of their properties.
+        """
+        for field in self._datetime_fields:
+            _str = self.dict.get(field)
+            if _str:
+                self._set_cached(field, parse(_str))
+
+    def _update(self, response):
+        """
+        Replaces the response dict of this object with a newer one,
+        dropping memoized values built from the old one.
+        """
+        self.dict = response
+        self._cache = None
+
+    def _set_cached(self, name, value):
+        """
+        Stores value as the memoized value of the cached_property name.
+        """
+        if self._cache is None:
+            self._cache = {}
+        self._cache[name] = value
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+# Resource types each list endpoint can filter by, i.e. the relations
+# that can be followed from a resource of the key's type.
+RELATIONS = {
+    'characters': ('comics', 'events', 'series', 'stories'),
+    'comics': ('characters', 'creators', 'events', 'series', 'stories'),
+    'creators': ('comics', 'events', 'series', 'stories'),
+    'events': ('characters', 'comics', 'creators', 'series', 'stories'),
+    'series': ('characters', 'comics', 'creators', 'events', 'stories'),
+    'stories': ('characters', 'comics', 'creators', 'events', 'series'),
+}
+
+
+class Crawler(object):
+
+    """
+    Breadth-first crawler of the resource graph
+
+    Starts from seed resources and follows the chosen relations up to
+    max_depth hops. Every (resource type, id) is fetched once, related
+    lists are paged concurrently on the client's thread pool, and the
+    client's cache, rate limiter and budget apply to every call.
+
+    With a checkpoint path, progress is saved after each depth and an
+    interrupted crawl resumes from the last finished depth. Resources
+    crawled before the interruption are not returned again, so persist
+    them from on_item. The checkpoint is removed once the crawl completes.
+
+    >>> crawler = Crawler(m, relations=('characters', 'comics'), max_depth=2)
+    >>> resources = crawler.crawl([('events', 253)])
+    >>> resources[('characters', 1009718)].name
+    u'Wolverine'
+
+    """
+
+    def __init__(self, marvel, relations=None, max_depth=1, workers=8, page_size=100,
+                 checkpoint=None, on_item=None):
+        """
+        :param marvel: Instance of Marvel class
+        :type marvel: marvel.Marvel
+        :param relations: Resource types to follow, all of them by default
+        :type relations: tuple
+        :param max_depth: Number of hops from the seeds
+        :type max_depth: int
+        :param workers: Maximum number of concurrent related lists
+        :type workers: int
+        :param page_size: limit param of the list calls, at most 100
+        :type page_size: int
+        :param checkpoint: Optional path of a json checkpoint file
+        :type checkpoint: str
+        :param on_item: Optional callback called with every new resource
+        :type on_item: function
+        """
+        self.marvel = marvel
+        self.relations = tuple(relations or RELATIONS)
+        self.max_depth = max_depth
+        self.workers = workers
+        self.page_size = page_size
+        self.checkpoint = checkpoint
+        self.on_item = on_item
+        self.getters = {
+            'characters': (marvel.get_character, marvel.get_characters),
+            'comics': (marvel.get_comic, marvel.get_comics),
+            'creators': (marvel.get_creator, marvel.get_creators),
+            'events': (marvel.get_event, marvel.get_events),
+            'series': (marvel.get_single_series, marvel.get_series),
+            'stories': (marvel.get_story, marvel.get_stories),
+        }
+
+    def crawl(self, seeds):
+        """
+        Crawls the graph from seeds.
+
+        :param seeds: DataItem instances (Character, Comic, etc.) or (resource type, id) tuples
+        :type seeds: list
+
+        :returns:  dict -- Resource instances keyed by (resource type, id)
+        """
+        items = {}
+        state = self._load()
+        if state is None:
+            keys = []
+            for seed in seeds:
+                if isinstance(seed, tuple):
+                    keys.append((seed[0], int(seed[1])))
+                else:
+                    key = (seed.resource_url(), seed.id)
+                    items[key] = seed
+                    keys.append(key)
+            self._emit(items.values())
+            missing = [key for key in keys if key not in items]
+            for key, item in zip(missing, self.marvel.map(self._fetch, missing, self.workers)):
+                if item is not None:
+                    items[key] = item
+                    self._emit([item])
+            state = {'depth': 0, 'frontier': keys, 'visited': keys}
+            self._save(state)
+
+        visited = set(state['visited'])
+        frontier = state['frontier']
+        depth = state['depth']
+        while depth < self.max_depth and frontier:
+            edges = [(key, relation) for key in frontier
+                     for relation in RELATIONS[key[0]] if relation in self.relations]
+            next_frontier = []
+            for related in self.marvel.map(self._related, edges, self.workers):
+                for item in related:
+                    key = (item.resource_url(), item.id)
+                    if key not in visited:
+                        visited.add(key)
+                        items[key] = item
+                        next_frontier.append(key)
+                        self._emit([item])
+            frontier = next_frontier
+            depth += 1
+            self._save({'depth': depth, 'frontier': frontier, 'visited': list(visited)})
+        self._clear()
+        return items
+
+    def _fetch(self, key):
+        wrapper = self.getters[key[0]][0](key[1])
+        if wrapper.code == 404:
+            return None
+        return self.marvel._page_results(wrapper)[0]
+
+    def _related(self, edge):
+        (resource, _id), relation = edge
+        params = {resource: _id, 'limit': self.page_size}
+        return self.getters[relation][1](**params).fetch_all(workers=self.workers)
+
+    def _emit(self, items):
+        if self.on_item is not None:
+            for item in items:
+                self.on_item(item)
+
+    def _load(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return None
+        with open(self.checkpoint) as f:
+            state = json.load(f)
+        for name in ('frontier', 'visited'):
+            state[name] = [(resource, _id) for resource, _id in state[name]]
+        return state
+
+    def _clear(self):
+        if self.checkpoint is not None and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    def _save(self, state):
+        if self.checkpoint is None:
+            return
+        path = self.checkpoint + '.tmp'
+        with open(path, 'w') as f:
+            json.dump(state, f)
+        getattr(os, 'replace', os.rename)(path, self.checkpoint)
@@ -8,6 +8,8 @@ from .structures import DataWrapper, DataItem
 
 class CreatorDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(CreatorDataWrapper, self).__init__(marvel, response, **params)
 
@@ -21,6 +23,7 @@ class Creator(DataItem):
     Creator object
     Takes a dict of creator attrs
     """
+    __slots__ = ()
     _resource_url = 'creators'
 
     @property
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import json
+from importlib import import_module
+
+# Decoders by preference. orjson and ujson are imported when first needed.
+DECODERS = ('orjson', 'ujson', 'json')
+
+
+def json_loads(content):
+    """
+    Decodes a json body with the standard library.
+
+    :param content: Raw body
+    :type content: bytes
+
+    :returns: dict
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    return json.loads(content)
+
+
+def load_decoder(name):
+    """
+    :returns: function -- loads() of the named module, None if it is not installed
+    """
+    if name == 'json':
+        return json_loads
+    try:
+        return import_module(name).loads
+    except ImportError:
+        return None
+
+
+def get_decoder(decoder=None):
+    """
+    Returns a function decoding json bytes.
+
+    >>> loads = get_decoder()  # orjson, ujson or json, whichever is installed first
+    >>> loads = get_decoder('json')
+
+    :param decoder: 'orjson', 'ujson', 'json' or a function taking bytes. \
+        None for the fastest one installed.
+    :type decoder: str
+
+    :returns: function
+    """
+    if callable(decoder):
+        return decoder
+    for name in DECODERS if decoder is None else (decoder,):
+        loads = load_decoder(name) if name in DECODERS else None
+        if loads is not None:
+            return loads
+    raise ImportError("json decoder %r is not installed" % (decoder,))
@@ -3,12 +3,15 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
+from .core import cached_property
 from .structures import DataItem, DataWrapper, Image
 from .summaries import EventSummary
 
 
 class EventDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(EventDataWrapper, self).__init__(marvel, response, **params)
 
@@ -22,7 +25,9 @@ class Event(DataItem):
     Event object
     Takes a dict of character attrs
     """
+    __slots__ = ()
     _resource_url = 'events'
+    _datetime_fields = ('modified', 'start', 'end')
 
     @property
     def title(self):
@@ -32,7 +37,7 @@ class Event(DataItem):
     def urls(self):
         return self.dict['urls']
 
-    @property
+    @cached_property
     def modified(self):
         return self.str_to_datetime(self.dict['modified'])
 
@@ -40,7 +45,7 @@ class Event(DataItem):
     def modified_raw(self):
         return self.dict['modified']
 
-    @property
+    @cached_property
     def start(self):
         return self.str_to_datetime(self.dict['start'])
 
@@ -48,7 +53,7 @@ class Event(DataItem):
     def start_raw(self):
         return self.dict['start']
 
-    @property
+    @cached_property
     def end(self):
         return self.str_to_datetime(self.dict['end'])
 
@@ -56,15 +61,15 @@ class Event(DataItem):
     def end_raw(self):
         return self.dict['end']
 
-    @property
+    @cached_property
     def thumbnail(self):
         return Image(self.marvel, self.dict['thumbnail'])
 
-    @property
+    @cached_property
     def next(self):
         return EventSummary(self.marvel, self.dict['next'])
 
-    @property
+    @cached_property
     def previous(self):
         return EventSummary(self.marvel, self.dict['previous'])
 
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+
+class MarvelError(Exception):
+
+    """
+    Base class for PyMarvel errors
+    """
+
+
+class ApiError(MarvelError):
+
+    """
+    The API answered with a non-successful code
+    """
+
+    def __init__(self, code, status):
+        """
+        :param code: code of the response
+        :type code: int
+        :param status: status or message of the response
+        :type status: str
+        """
+        super(ApiError, self).__init__("%s: %s" % (code, status))
+        self.code = code
+        self.status = status
+
+
+class RateLimitExceeded(MarvelError):
+
+    """
+    The client-side rate limiter has no tokens left and is configured not to wait
+    """
+
+
+class QuotaExceeded(MarvelError):
+
+    """
+    The daily call budget of the API key is used up
+    """
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+
+from .core import parse_datetime
+
+COLLECTIONS = ('characters', 'comics', 'creators', 'events', 'series', 'stories')
+
+# Field holding the display name of each resource type
+NAME_FIELDS = {
+    'characters': 'name',
+    'comics': 'title',
+    'creators': 'fullName',
+    'events': 'title',
+    'series': 'title',
+    'stories': 'title',
+}
+
+
+def sortable_datetime(_str):
+    """
+    Converts '2013-11-20T17:40:18-0500' to UTC '2013-11-20T22:40:18',
+    which sorts and compares as a string. A date alone is taken as UTC midnight.
+
+    :returns: str -- None if _str is not a valid date
+    """
+    if _str and len(_str) == 10:
+        _str += 'T00:00:00+0000'
+    try:
+        date = parse_datetime(_str)
+    except ValueError:
+        return None
+    return (date.replace(tzinfo=None) - date.utcoffset()).isoformat()
+
+
+def related_ids(item):
+    """
+    Reads the ids of the resources an item lists in its summaries,
+    e.g. the characters of a comic.
+
+    :returns: list -- (resource type, id) tuples
+    """
+    ids = []
+    for value in item.dict.values():
+        if not isinstance(value, dict):
+            continue
+        summaries = value.get('items', [value])
+        for summary in summaries:
+            uri = summary.get('resourceURI') if isinstance(summary, dict) else None
+            if uri:
+                resource, _id = uri.rstrip('/').split('/')[-2:]
+                if resource in NAME_FIELDS and resource != item.resource_url() and _id.isdigit():
+                    ids.append((resource, int(_id)))
+    return ids
+
+
+class JSONLStore(object):
+
+    """
+    Stores resources as JSON lines, one file per resource type
+
+    Files are appended to, so when a resource is written more than once
+    its last line is the current one. Checkpoints, with the byte size of
+    each file when they were saved, are kept in checkpoints.json; on
+    resume anything written after the last checkpoint is truncated.
+
+    >>> store = JSONLStore('mirror')
+
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Directory of the files, created if missing
+        :type directory: str
+        """
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._checkpoints = self._load('checkpoints.json')
+        self._high_water = self._load('high_water.json')
+
+    def path(self, resource):
+        """
+        :returns: str -- Path of the file of resource
+        """
+        return os.path.join(self.directory, '%s.jsonl' % resource)
+
+    def checkpoint(self, resource):
+        """
+        :returns: dict -- Last checkpoint of resource, None if there is none
+        """
+        return self._checkpoints.get(resource)
+
+    def begin(self, resource, checkpoint=None, replace=False):
+        """
+        Prepares the file of resource for writing, truncating it to the
+        position of checkpoint when resuming.
+
+        :param checkpoint: Checkpoint the run resumes from
+        :type checkpoint: dict
+        :param replace: Empty the file if not resuming
+        :type replace: bool
+        """
+        with open(self.path(resource), 'ab') as f:
+            if checkpoint is not None:
+                f.truncate(checkpoint['position'])
+            elif replace:
+                f.truncate(0)
+
+    def write(self, resource, items, checkpoint=None):
+        """
+        Appends items, then saves checkpoint for resource.
+
+        :param items: Resource instances (Character, Comic, etc)
+        :type items: list
+        :param checkpoint: Progress of the export, e.g. {'offset': 200, 'total': 1485}
+        :type checkpoint: dict
+        """
+        with open(self.path(resource), 'ab') as f:
+            for item in items:
+                f.write(json.dumps(item.dict).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+            position = f.tell()
+        if checkpoint is not None:
+            self.save_checkpoint(resource, dict(checkpoint, position=position))
+
+    def save_checkpoint(self, name, checkpoint):
+        """
+        Saves a checkpoint without writing resources, e.g. the progress of
+        Exporter.export() over collections.
+        """
+        self._checkpoints[name] = checkpoint
+        self._save('checkpoints.json', self._checkpoints)
+
+    def clear_checkpoint(self, name):
+        if self._checkpoints.pop(name, None) is not None:
+            self._save('checkpoints.json', self._checkpoints)
+
+    def clear_checkpoints(self):
+        self._checkpoints = {}
+        self._save('checkpoints.json', self._checkpoints)
+
+    def high_water(self, resource):
+        """
+        :returns: str -- Latest modified date synced for resource, None if never synced
+        """
+        return self._high_water.get(resource)
+
+    def set_high_water(self, resource, modified):
+        self._high_water[resource] = modified
+        self._save('high_water.json', self._high_water)
+
+    def close(self):
+        pass
+
+    def _load(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save(self, name, state):
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        getattr(os, 'replace', os.rename)(path + '.tmp', path)
+
+
+class SQLiteStore(object):
+
+    """
+    Stores resources in a SQLite database
+
+    Resources are upserted by (resource type, id), and each page is
+    written in the same transaction as its checkpoint.
+
+    Names, modified dates (in UTC) and the relations listed in the
+    summaries of each resource are indexed for OfflineMarvel. Relations
+    are recorded in both directions and are not removed when a resource
+    is updated.
+
+    >>> store = SQLiteStore('mirror.db')
+
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the database file
+        :type path: str
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS resources (
+                resource TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                name TEXT COLLATE NOCASE,
+                modified TEXT,
+                body TEXT NOT NULL,
+                PRIMARY KEY (resource, id)
+            );
+            CREATE INDEX IF NOT EXISTS resources_name ON resources (resource, name);
+            CREATE INDEX IF NOT EXISTS resources_modified ON resources (resource, modified);
+            CREATE TABLE IF NOT EXISTS relations (
+                resource TEXT NOT NULL,
+                related TEXT NOT NULL,
+                related_id INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (resource, related, related_id, id)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                resource TEXT PRIMARY KEY,
+                state TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS high_water (
+                resource TEXT PRIMARY KEY,
+                modified TEXT NOT NULL
+            );
+        """)
+
+    def checkpoint(self, resource):
+        """
+        :returns: dict -- Last checkpoint of resource, None if there is none
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM checkpoints WHERE resource = ?", (resource,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def begin(self, resource, checkpoint=None, replace=False):
+        """
+        Stored resources are upserted, so nothing needs to be prepared.
+        """
+        pass
+
+    def write(self, resource, items, checkpoint=None):
+        """
+        Upserts items and saves checkpoint for resource in one transaction.
+
+        :param items: Resource instances (Character, Comic, etc)
+        :type items: list
+        :param checkpoint: Progress of the export, e.g. {'offset': 200, 'total': 1485}
+        :type checkpoint: dict
+        """
+        rows = []
+        relations = []
+        for item in items:
+            rows.append((resource, item.id, item.dict.get(NAME_FIELDS[resource]),
+                         sortable_datetime(item.dict.get('modified')), json.dumps(item.dict)))
+            for related, related_id in related_ids(item):
+                relations.append((resource, related, related_id, item.id))
+                relations.append((related, resource, item.id, related_id))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.executemany(
+                "INSERT OR IGNORE INTO relations VALUES (?, ?, ?, ?)", relations)
+            if checkpoint is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)",
+                    (resource, json.dumps(checkpoint)))
+
+    def save_checkpoint(self, name, checkpoint):
+        """
+        Saves a checkpoint without writing resources, e.g. the progress of
+        Exporter.export() over collections.
+        """
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (name, json.dumps(checkpoint)))
+
+    def clear_checkpoint(self, name):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM checkpoints WHERE resource = ?", (name,))
+
+    def clear_checkpoints(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM checkpoints")
+
+    def high_water(self, resource):
+        """
+        :returns: str -- Latest modified date synced for resource, None if never synced
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT modified FROM high_water WHERE resource = ?", (resource,)).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, resource, modified):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO high_water VALUES (?, ?)", (resource, modified))
+
+    def query(self, sql, params=()):
+        """
+        Runs a read-only SQL query against the store.
+
+        :returns: list -- Rows
+        """
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def count(self, resource):
+        """
+        :returns: int -- Number of stored resources of a type
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM resources WHERE resource = ?", (resource,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Exporter(object):
+
+    """
+    Mirrors whole collections to a local store
+
+    Pages each collection with up to workers concurrent calls through the
+    list methods of the client, writing pages in offset order and saving
+    a checkpoint after each one. An interrupted run resumes each
+    collection from its last written offset, and a collection's
+    checkpoint is removed once it is done. export() and sync() also
+    record which collections they finished, so an interrupted run skips
+    them when it resumes.
+
+    Each finished collection records the latest modified date it saw as
+    its high-water mark. sync() then only pages through resources
+    modified since that mark and upserts them.
+
+    >>> exporter = Exporter(m, SQLiteStore('mirror.db'), workers=8)
+    >>> exporter.export()
+    {'characters': 1485, 'comics': 41873, ...}
+    >>> exporter.sync()
+    {'characters': 3, 'comics': 214, ...}
+
+    """
+
+    def __init__(self, marvel, store, resources=COLLECTIONS, workers=8, page_size=100):
+        """
+        :param marvel: Instance of Marvel class
+        :type marvel: marvel.Marvel
+        :param store: JSONLStore, SQLiteStore or an object with the same methods
+        :type store: marvel.export.SQLiteStore
+        :param resources: Collections to export
+        :type resources: tuple
+        :param workers: Maximum number of pages fetched at once
+        :type workers: int
+        :param page_size: limit param of the list calls, at most 100
+        :type page_size: int
+        """
+        self.marvel = marvel
+        self.store = store
+        self.resources = resources
+        self.workers = workers
+        self.page_size = page_size
+        self.getters = {
+            'characters': marvel.get_characters,
+            'comics': marvel.get_comics,
+            'creators': marvel.get_creators,
+            'events': marvel.get_events,
+            'series': marvel.get_series,
+            'stories': marvel.get_stories,
+        }
+
+    def export(self):
+        """
+        Exports every collection of resources, resuming from checkpoints.
+
+        :returns: dict -- Number of resources written by this run, per collection
+        """
+        return self._each('export', self.export_resource)
+
+    def export_resource(self, resource, **params):
+        """
+        Exports one collection, resuming from its checkpoint.
+
+        :param resource: Collection name, e.g. 'comics'
+        :type resource: str
+        :param params: Extra params of the list calls
+        :type params: dict
+
+        :returns: int -- Number of resources written
+        """
+        return self._run(resource, params, replace=True)
+
+    def sync(self):
+        """
+        Syncs every collection of resources, resuming from checkpoints.
+
+        :returns: dict -- Number of resources written by this run, per collection
+        """
+        return self._each('sync', self.sync_resource)
+
+    def _each(self, run, method):
+        # The collections finished by an interrupted run are kept in the
+        # checkpoint named after the run, and skipped when it resumes
+        progress = self.store.checkpoint(run) or {'done': []}
+        counts = {}
+        for resource in self.resources:
+            if resource in progress['done']:
+                counts[resource] = 0
+                continue
+            counts[resource] = method(resource)
+            progress['done'].append(resource)
+            self.store.save_checkpoint(run, progress)
+        self.store.clear_checkpoint(run)
+        return counts
+
+    def sync_resource(self, resource):
+        """
+        Upserts the resources of a collection modified since its high-water
+        mark, ordered by modified date. Exports the whole collection if it
+        has no high-water mark yet.
+
+        Pages are fetched one after the other, each starting from the last
+        modified date of the previous one rather than from an offset: a
+        resource modified during the sync moves to the end of the list,
+        which would shift the following ones past an offset boundary. An
+        interrupted sync resumes from its checkpoint, like an export.
+
+        :param resource: Collection name, e.g. 'comics'
+        :type resource: str
+
+        :returns: int -- Number of resources written
+        """
+        since = self.store.high_water(resource)
+        checkpoint = self.store.checkpoint(resource)
+        if since is None or checkpoint is not None and 'cursor' not in checkpoint:
+            # Not exported yet, or resuming an interrupted export
+            return self.export_resource(resource)
+
+        if checkpoint is not None:
+            state = checkpoint
+        else:
+            # cursor is the modifiedSince of the next page and offset the
+            # number of resources already written with that very date
+            state = {'cursor': since, 'offset': 0, 'modified': since, 'done': False}
+        self.store.begin(resource, checkpoint)
+
+        count = 0
+        while not state['done']:
+            page = self.getters[resource](modifiedSince=state['cursor'], orderBy='modified',
+                                          limit=self.page_size, offset=state['offset'])
+            results = self.marvel._page_results(page)
+            for item in results:
+                state['modified'] = self._latest(state['modified'], item.dict.get('modified'))
+            data = page.data
+            last = results[-1].dict.get('modified') if results else None
+            if not results or data.offset + data.count >= data.total:
+                state['done'] = True
+            elif last == state['cursor'] or sortable_datetime(last) is None:
+                state['offset'] += len(results)
+            else:
+                state['cursor'] = last
+                state['offset'] = len([item for item in results if item.dict.get('modified') == last])
+            self.store.write(resource, results, state)
+            count += len(results)
+        self._finish(resource, state)
+        return count
+
+    def _run(self, resource, params, replace):
+        checkpoint = self.store.checkpoint(resource)
+        if checkpoint is not None:
+            # Resume the interrupted run, whatever it was
+            params = checkpoint['params']
+            if checkpoint['offset'] >= checkpoint['total']:
+                self._finish(resource, checkpoint)
+                return 0
+        self.store.begin(resource, checkpoint, replace)
+
+        state = {'params': params, 'modified': self.store.high_water(resource)}
+        if checkpoint is not None:
+            state['modified'] = checkpoint['modified']
+        query = dict(params, limit=self.page_size, offset=checkpoint['offset'] if checkpoint else 0)
+        first = self.getters[resource](**query)
+        count = self._write(resource, first, state)
+
+        pages = iter(first.page_params())
+        pending = deque()
+        try:
+            for page_params in pages:
+                pending.append(self.marvel.submit(first.getter, **page_params))
+                if len(pending) == self.workers:
+                    break
+            while pending:
+                page = pending.popleft().result()
+                for page_params in pages:
+                    pending.append(self.marvel.submit(first.getter, **page_params))
+                    break
+                count += self._write(resource, page, state)
+        finally:
+            for future in pending:
+                future.cancel()
+        self._finish(resource, state)
+        return count
+
+    def _write(self, resource, page, state):
+        results = self.marvel._page_results(page)
+        for item in results:
+            state['modified'] = self._latest(state['modified'], item.dict.get('modified'))
+        data = page.data
+        state.update(offset=data.offset + data.count, total=data.total)
+        self.store.write(resource, results, state)
+        return len(results)
+
+    def _finish(self, resource, state):
+        if state['modified'] is not None:
+            self.store.set_high_water(resource, state['modified'])
+        self.store.clear_checkpoint(resource)
+
+    def _latest(self, current, modified):
+        try:
+            date = parse_datetime(modified)
+        except ValueError:
+            return current  # e.g. '-0001-11-30T00:00:00-0500'
+        if current is None or date > parse_datetime(current):
+            return modified
+        return current
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class IdentityMap(object):
+
+    """
+    Identity map of resources
+
+    Keeps one canonical DataItem per (resource type, id). When the same
+    resource is returned again, by another page, a related resource call
+    or Summary.get(), the canonical instance is returned instead, updated
+    with the new data if its modified date is more recent.
+
+    Memory is bounded either by weak references (resources are dropped
+    once nothing else uses them) or by evicting the least recently used
+    resources past maxsize.
+
+    >>> m = Marvel(public_key, private_key, identity_map=IdentityMap(maxsize=50000))
+    >>> m.get_character(1009718).data.result is m.get_character(1009718).data.result
+    True
+
+    """
+
+    def __init__(self, maxsize=None, weak=False):
+        """
+        :param maxsize: Maximum number of resources, None for no limit. Ignored if weak.
+        :type maxsize: int
+        :param weak: Hold resources with weak references instead
+        :type weak: bool
+        """
+        self.maxsize = maxsize
+        self.weak = weak
+        self._items = weakref.WeakValueDictionary() if weak else OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, resource, _id):
+        """
+        :param resource: Resource type, e.g. 'comics'
+        :type resource: str
+        :param _id: Resource id
+        :type _id: int
+
+        :returns: DataItem or None
+        """
+        key = (resource, int(_id))
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and not self.weak:
+                self._items[key] = self._items.pop(key)
+            return item
+
+    def add(self, item):
+        """
+        Returns the canonical instance of item's resource, registering
+        item if it is the first one seen.
+
+        :param item: Resource instance
+        :type item: marvel.structures.DataItem
+
+        :returns: DataItem
+        """
+        key = (item.resource_url(), item.id)
+        with self._lock:
+            canonical = self._items.get(key)
+            if canonical is None:
+                self._items[key] = item
+                if not self.weak and self.maxsize is not None:
+                    while len(self._items) > self.maxsize:
+                        self._items.popitem(last=False)
+                return item
+            if not self.weak:
+                self._items[key] = self._items.pop(key)
+
+        if canonical is not item and self._is_newer(item, canonical):
+            canonical._update(item.dict)
+        return canonical
+
+    def _is_newer(self, item, canonical):
+        new, old = item.dict.get('modified'), canonical.dict.get('modified')
+        if not new:
+            return False
+        if not old:
+            return True
+        try:
+            return item.modified > canonical.modified
+        except ValueError:
+            return new != old
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
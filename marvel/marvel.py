@@ -3,19 +3,42 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
-import hashlib
 import datetime
+import logging
+import time
+import threading
+from collections import deque
+
+# The HTTP stack, the thread pool, the json decoder and the resource
+# modules are imported on first use, so that importing marvel stays cheap.
+from .cache import cache_key
+from .exceptions import ApiError
+from .metrics import CallEvent, clock
+from .singleflight import SingleFlight
 
-import requests
+DEFAULT_API_VERSION = 'v1'
 
-from .character import Character, CharacterDataWrapper
-from .comic import ComicDataWrapper, Comic
-from .creator import CreatorDataWrapper, Creator
-from .event import EventDataWrapper, Event
-from .series import SeriesDataWrapper, Series
-from .story import StoryDataWrapper, Story
+logger = logging.getLogger(__name__)
 
-DEFAULT_API_VERSION = 'v1'
+
+class Call(object):
+
+    """
+    State of a single Marvel._call
+    """
+
+    def __init__(self, resource_url, params):
+        self.resource_url = resource_url
+        self.params = params
+        self.url = None
+        self.headers = None
+        self.key = None
+        self.entry = None
+        self.body = None
+        self.raw = False
+        self.attempts = 0
+        self.response = None
+        self.cache_status = None
 
 
 class Marvel(object):
@@ -26,29 +49,512 @@ class Marvel(object):
 
     >>> m = Marvel("acb123....", "efg456...")
 
+    An instance is safe to share between threads. submit() and map() run
+    calls on its thread pool, within its rate limits:
+
+    >>> comics = m.map(m.get_comic, comic_ids, workers=16)
+
+    All calls share one transport, by default a pooled, keep-alive
+    RequestsTransport. Close it when done, or use the client as a
+    context manager:
+
+    >>> with Marvel("acb123....", "efg456...") as m:
+    ...     m.get_character(1009718)
+
     """
 
-    def __init__(self, public_key, private_key):
+    def __init__(self, public_key, private_key, transport=None, cache=None,
+                 rate_limiter=None, budget=None, retry=None, single_flight=True, max_workers=8, identity_map=None,
+                 decoder=None, endpoint=None, on_call=None):
+        """
+        :param public_key: Marvel API public key
+        :type public_key: str
+        :param private_key: Marvel API private key
+        :type private_key: str
+        :param transport: Transport used for every call. Defaults to RequestsTransport()
+        :type transport: marvel.transport.Transport
+        :param cache: Optional response cache, e.g. ResponseCache or SQLiteCache
+        :type cache: marvel.cache.BaseCache
+        :param rate_limiter: Optional client-side rate limiter
+        :type rate_limiter: marvel.ratelimit.TokenBucket
+        :param budget: Optional daily call budget of the key
+        :type budget: marvel.ratelimit.DailyBudget
+        :param retry: Optional retry policy for transient failures
+        :type retry: marvel.retry.RetryPolicy
+        :param single_flight: Share one request between concurrent identical calls
+        :type single_flight: bool
+        :param max_workers: Size of the thread pool used by submit(), map() and the parallel helpers
+        :type max_workers: int
+        :param identity_map: Optional identity map sharing one instance per resource
+        :type identity_map: marvel.identity.IdentityMap
+        :param decoder: json decoder, 'orjson', 'ujson', 'json' or a function taking bytes. \
+            Defaults to the fastest one installed.
+        :type decoder: str
+        :param endpoint: Base url of the API, e.g. a local stand-in. Defaults to the Marvel gateway.
+        :type endpoint: str
+        :param on_call: Optional callback, or list of callbacks, called with a marvel.metrics.CallEvent \
+            after every call, e.g. a marvel.metrics.MetricsCollector. Exceptions they raise are logged.
+        :type on_call: function
+        """
         self.public_key = public_key
         self.private_key = private_key
+        self._transport = transport
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.budget = budget
+        self.retry = retry
+        self.single_flight = SingleFlight() if single_flight else None
+        self.max_workers = max_workers
+        self.identity_map = identity_map
+        self._decoder = decoder
+        self.endpoint = endpoint
+        self.on_call = [on_call] if callable(on_call) else list(on_call or ())
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._setup_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def transport(self):
+        """
+        Transport of the client. A RequestsTransport is created on first use if none was given.
+
+        :returns: marvel.transport.Transport
+        """
+        if self._transport is None:
+            with self._setup_lock:
+                if self._transport is None:
+                    from .transport import RequestsTransport
+                    self._transport = RequestsTransport()
+        return self._transport
+
+    @property
+    def decoder(self):
+        """
+        Function decoding json responses, see marvel.decoder.get_decoder().
+
+        :returns: function
+        """
+        if not callable(self._decoder):
+            from .decoder import get_decoder
+            self._decoder = get_decoder(self._decoder)
+        return self._decoder
+
+    @property
+    def quota_remaining(self):
+        """
+        Calls left today in the daily budget, None if no budget is set.
+
+        :returns: int
+        """
+        if self.budget is None:
+            return None
+        return self.budget.remaining
+
+    @property
+    def executor(self):
+        """
+        Thread pool of the client, created on first use.
+
+        :returns: concurrent.futures.ThreadPoolExecutor
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the client's thread pool.
+        From a thread of the pool, fn runs right away in that thread,
+        so nested calls cannot exhaust the pool.
+
+        >>> future = m.submit(m.get_character, 1009718)
+        >>> print future.result().data.result.name
+        Wolverine
+
+        :returns:  concurrent.futures.Future
+        """
+        if getattr(self._local, 'in_pool', False):
+            from concurrent.futures import Future
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as error:
+                future.set_exception(error)
+            return future
+        return self.executor.submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        self._local.in_pool = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.in_pool = False
+
+    def map(self, fn, iterable, workers=None):
+        """
+        Calls fn on every item of iterable on the client's thread pool,
+        with at most workers calls running at once.
+
+        >>> comics = m.map(m.get_comic, [17731, 1308], workers=16)
+
+        :param fn: function taking one item
+        :type fn: function
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  list -- Results of fn, in the order of iterable
+        """
+        workers = workers or self.max_workers
+        results = []
+        pending = deque()
+        try:
+            for item in iterable:
+                pending.append(self.submit(fn, item))
+                if len(pending) >= workers:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+        return results
+
+    def close(self):
+        """
+        Shuts down the thread pool and closes the underlying transport
+        and its pooled connections.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+        if self._transport is not None:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _endpoint(self):
+        if self.endpoint is not None:
+            return self.endpoint
         return "http://gateway.marvel.com/%s/public/" % (DEFAULT_API_VERSION)
 
     def _call(self, resource_url, **params):
         """
         Calls the Marvel API endpoint
 
+        If a cache is set, fresh entries are returned without a request.
+        Otherwise a stored etag is sent as If-None-Match and a
+        304 Not Modified returns the stored response.
+        Transient failures are retried according to the retry policy.
+        Concurrent identical calls share a single request.
+        Every call is reported to the on_call callbacks.
+
         :param resource_url: url slug of the resource
         :type resource_url: str
         :param params: query params to add to endpoint
         :type params: str
 
-        :returns:  response -- Requests response
+        :returns:  dict -- Decoded json response
+        """
+        return self._observe(self._prepare(resource_url, params))
+
+    def get_raw(self, resource_url, **params):
+        """
+        Calls the Marvel API endpoint and returns the undecoded body,
+        e.g. to write it to a file as is. The cache is not used.
+
+        >>> content = m.get_raw('comics', limit=100)
+
+        :param resource_url: url slug of the resource (e.g. 'comics' or 'comics/1308')
+        :type resource_url: str
+        :param params: query params to add to endpoint
+        :type params: str
+
+        :raises: ApiError
+        :returns:  bytes -- Raw json response
+        """
+        return self._observe(self._prepare(resource_url, params, raw=True))
+
+    def _observe(self, call):
+        """
+        Runs call, reporting it to the on_call callbacks.
+
+        :returns:  dict -- Decoded json response
+        """
+        if not self.on_call:
+            return self._execute(call)
+        start = clock()
+        try:
+            body = self._execute(call)
+        except Exception as error:
+            self._emit(CallEvent(call, clock() - start, error=error))
+            raise
+        self._emit(CallEvent(call, clock() - start, body=body))
+        return body
+
+    def _execute(self, call):
+        """
+        Answers call from the cache, the request of an identical call in
+        flight, or a new request. Raw calls always send their own request.
+
+        :returns:  dict -- Decoded json response
+        """
+        if call.body is not None:
+            return call.body
+        if self.single_flight is not None and not call.raw:
+            body, call.response = self.single_flight.do(call.key, self._shared, call)
+            return body
+        return self._send(call)
+
+    def _shared(self, call):
+        """
+        Sends call for every identical call in flight. They get its
+        response along with the body, for their CallEvent.
+
+        :returns:  tuple -- Decoded json response and transport response
+        """
+        return self._send(call), call.response
+
+    def _emit(self, event):
+        # A failing callback must not fail the call, or hide its error
+        for callback in self.on_call:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("on_call callback %r failed", callback)
+
+    def _send(self, call):
+        """
+        Sends call through the transport, retrying transient failures.
+
+        :returns:  dict -- Decoded json response
+        """
+        while True:
+            call.attempts += 1
+            wait = self._reserve()
+            if wait:
+                time.sleep(wait)
+            try:
+                response = call.response = self.transport.get(call.url, params=call.params,
+                                                              headers=call.headers)
+                delay = self._retry_delay(call, response=response)
+                if delay is None:
+                    return self._finish(call, response)
+            except Exception as error:
+                delay = self._retry_delay(call, error=error)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    def _prepare(self, resource_url, params, raw=False):
+        """
+        Builds the request for a call, consulting the cache unless raw.
+        call.body is set if a fresh cached response can be returned as is.
+
+        :returns:  Call
+        """
+        call = Call(resource_url, params)
+        call.url = "{0}{1}".format(self._endpoint(), resource_url)
+        call.key = cache_key(resource_url, params)
+        call.raw = raw
+        if self.cache is not None and not raw:
+            call.entry = self.cache.get(call.key)
+            call.cache_status = 'miss'
+            if call.entry is not None:
+                if self.cache.is_fresh(call.entry, resource_url, params):
+                    call.body = call.entry.body
+                    call.cache_status = 'hit'
+                    return call
+                if call.entry.etag:
+                    call.headers = {'If-None-Match': call.entry.etag}
+
+        call.params = dict(params, **self._auth())
+        return call
+
+    def _reserve(self):
+        """
+        Takes a rate limiter token and records a call against the daily budget.
+
+        :raises: RateLimitExceeded, QuotaExceeded
+        :returns:  float -- Seconds to wait before calling the API
+        """
+        wait = 0
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve()
+        if self.budget is not None:
+            self.budget.consume()
+        return wait
+
+    def _retry_delay(self, call, response=None, error=None):
+        """
+        :returns:  float -- Seconds to wait before retrying call, None to not retry
+        """
+        if self.retry is None:
+            return None
+        return self.retry.next_delay(call.resource_url, call.attempts,
+                                     response=response, error=error)
+
+    def _finish(self, call, response):
+        """
+        Turns a transport response into the decoded body, updating the cache.
+        Raw calls return the undecoded body.
+
+        :returns:  dict -- Decoded json response
+        """
+        if call.raw:
+            if response.status_code != 200:
+                raise ApiError(response.status_code, response.content)
+            return response.content
+
+        if response.status_code == 304 and call.entry is not None:
+            self.cache.touch(call.key)
+            call.cache_status = 'revalidated'
+            return call.entry.body
+
+        body = self.decoder(response.content)
+        if self.cache is not None and response.status_code == 200:
+            etag = body.get('etag') or response.headers.get('ETag')
+            if etag:
+                self.cache.set(call.key, body, etag, content=response.content)
+        return body
+
+    def _get(self, wrapper_class, resource_url, params, **kwargs):
         """
-        url = "{0}{1}".format(self._endpoint(), resource_url)
-        params.update(self._auth())
-        return requests.get(url, params=params).json()
+        Calls resource_url with params and wraps the response.
+
+        :param wrapper_class: DataWrapper class of the resource
+        :type wrapper_class: marvel.structures.DataWrapper
+        :param kwargs: params the DataWrapper keeps for pagination
+        :type kwargs: dict
+
+        :returns:  DataWrapper
+        """
+        response = self._call(resource_url, **params)
+        return wrapper_class(self, response, **kwargs)
+
+    def _fetch_all(self, wrapper, pages, workers):
+        """
+        Fetches pages with up to workers concurrent calls and merges
+        their results after the results of wrapper.
+
+        :param wrapper: First page
+        :type wrapper: marvel.structures.DataWrapper
+        :param pages: params of the remaining pages, see DataWrapper.page_params()
+        :type pages: list
+
+        :returns: list -- merged results, in offset order
+        """
+        results = list(self._page_results(wrapper))
+        for page in self.map(lambda params: wrapper.getter(**params), pages, workers):
+            results.extend(self._page_results(page))
+        return results
+
+    def _fetch_columns(self, wrapper, pages, fields, workers, backend):
+        """
+        Fetches pages with up to workers concurrent calls and builds
+        columns over the results of wrapper and every page.
+
+        :returns: OrderedDict -- Arrays keyed by field
+        """
+        from .columns import pages_to_columns
+        pages = self.map(lambda params: wrapper.getter(**params), pages, workers)
+        return pages_to_columns([wrapper] + pages, fields, backend)
+
+    def _iter_results(self, wrapper, pages, prefetch):
+        """
+        Yields the results of wrapper and of every page in pages,
+        keeping up to prefetch pages in flight.
+        """
+        pages = iter(pages)
+        pending = deque()
+        try:
+            for params in pages:
+                pending.append(self.submit(wrapper.getter, **params))
+                if len(pending) == prefetch:
+                    break
+            for item in self._page_results(wrapper):
+                yield item
+            while pending:
+                page = pending.popleft().result()
+                for params in pages:
+                    pending.append(self.submit(wrapper.getter, **params))
+                    break
+                for item in self._page_results(page):
+                    yield item
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _page_results(self, page):
+        if page.code != 200:
+            raise ApiError(page.code, page.status or page.dict.get('message'))
+        return page.data.results
+
+    def _get_by_ids(self, resource, getter, ids, workers):
+        """
+        Fetches resources by id with up to workers concurrent calls.
+        Resources held by the identity map are not fetched again.
+
+        :param resource: Resource type (e.g. 'comics')
+        :type resource: str
+        :param getter: A single resource method (e.g. get_comic)
+        :type getter: function
+        :param ids: Resource ids, duplicates are fetched once
+        :type ids: iterable
+
+        :returns:  BatchResult
+        """
+        result, ids = self._known_ids(resource, ids)
+        return self._batch_result(ids, self.map(getter, ids, workers), result)
+
+    def _known_ids(self, resource, ids):
+        """
+        :returns:  tuple -- BatchResult of the ids in the identity map, and the other unique ids
+        """
+        from .structures import BatchResult
+        result = BatchResult()
+        unknown = []
+        for _id in self._unique_ids(ids):
+            item = None
+            if self.identity_map is not None:
+                item = self.identity_map.get(resource, _id)
+            if item is not None:
+                result[_id] = item
+            else:
+                unknown.append(_id)
+        return result, unknown
+
+    def _unique_ids(self, ids):
+        unique = []
+        seen = set()
+        for _id in ids:
+            _id = int(_id)
+            if _id not in seen:
+                seen.add(_id)
+                unique.append(_id)
+        return unique
+
+    def _batch_result(self, ids, wrappers, result):
+        for _id, wrapper in zip(ids, wrappers):
+            if wrapper.code == 404:
+                result.missing.append(_id)
+            else:
+                result[_id] = self._page_results(wrapper)[0]
+        return result
+
+    def _result(self, value):
+        """
+        Returns value the way this client returns call results.
+        Marvel returns it unchanged, AsyncMarvel returns an awaitable.
+        """
+        return value
 
     def _auth(self):
         """
@@ -56,9 +562,10 @@ class Marvel(object):
 
         :returns:  str -- URL encoded query parameters containing "ts", "apikey", and "hash"
         """
+        import hashlib
         ts = datetime.datetime.now().strftime("%Y-%m-%d%H:%M:%S")
         hash_string = hashlib.md5(
-            "%s%s%s" % (ts, self.private_key, self.public_key)).hexdigest()
+            ("%s%s%s" % (ts, self.private_key, self.public_key)).encode('utf-8')).hexdigest()
         auth = {
             'ts': ts,
             'apikey': self.public_key,
@@ -67,6 +574,24 @@ class Marvel(object):
         return auth
 
     # public methods
+    def iter_results(self, method, prefetch=2, **kwargs):
+        """Iterates over every result of a list method, across pages,
+        prefetching the next pages in the background.
+
+        :param method: A list method of this class (e.g. get_comics)
+        :type method: function
+        :param prefetch: Number of pages fetched ahead
+        :type prefetch: int
+
+        :returns:  iterator -- Resource instances (Comic, Creator, etc).
+
+        >>> m = Marvel(public_key, private_key)
+        >>> for comic in m.iter_results(m.get_comics, characters=1009718, limit=100):
+        ...     print comic.title
+
+        """
+        return method(**kwargs).iter_results(prefetch)
+
     def get_character(self, _id, **kwargs):
         """Fetches a single character by id.
 
@@ -85,9 +610,9 @@ class Marvel(object):
         Wolverine
 
         """
+        from .character import Character, CharacterDataWrapper
         url = "%s/%s" % (Character.resource_url(), _id)
-        response = self._call(url)
-        return CharacterDataWrapper(self, response, **kwargs)
+        return self._get(CharacterDataWrapper, url, {}, **kwargs)
 
     def get_characters(self, **kwargs):
         """Fetches lists of comic characters with optional filters.
@@ -110,8 +635,32 @@ class Marvel(object):
 
         """
         # pass url string and params string to _call
-        response = self._call(Character.resource_url(), **kwargs)
-        return CharacterDataWrapper(self, response, **kwargs)
+        from .character import Character, CharacterDataWrapper
+        return self._get(CharacterDataWrapper, Character.resource_url(), kwargs, **kwargs)
+
+    def get_characters_by_ids(self, ids, workers=None):
+        """Fetches many characters by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter characters by their own id, so each id is a
+        get /v1/public/characters/{id} call, run up to workers at a time.
+
+        :param ids: Character ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Character by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_characters_by_ids([1009718, 1009351, 1])
+        >>> print sorted(found), found.missing
+        [1009351, 1009718] [1]
+
+        """
+        from .character import Character
+        return self._get_by_ids(Character.resource_url(), self.get_character, ids, workers)
 
     def get_comic(self, _id, **kwargs):
         """Fetches a single comic by id.
@@ -131,9 +680,9 @@ class Marvel(object):
         Some Comic
         """
 
+        from .comic import Comic, ComicDataWrapper
         url = "%s/%s" % (Comic.resource_url(), _id)
-        response = self._call(url)
-        return ComicDataWrapper(self, response, **kwargs)
+        return self._get(ComicDataWrapper, url, {}, **kwargs)
 
     def get_comics(self, **kwargs):
         """
@@ -152,8 +701,32 @@ class Marvel(object):
 
         """
 
-        response = self._call(Comic.resource_url(), **kwargs)
-        return ComicDataWrapper(self, response, **kwargs)
+        from .comic import Comic, ComicDataWrapper
+        return self._get(ComicDataWrapper, Comic.resource_url(), kwargs, **kwargs)
+
+    def get_comics_by_ids(self, ids, workers=None):
+        """Fetches many comics by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter comics by their own id, so each id is a
+        get /v1/public/comics/{id} call, run up to workers at a time.
+
+        :param ids: Comic ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Comic by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_comics_by_ids([17731, 1308, 1])
+        >>> print sorted(found), found.missing
+        [1308, 17731] [1]
+
+        """
+        from .comic import Comic
+        return self._get_by_ids(Comic.resource_url(), self.get_comic, ids, workers)
 
     def get_creator(self, _id, **kwargs):
         """Fetches a single creator by id.
@@ -173,9 +746,9 @@ class Marvel(object):
         Stan Lee
         """
 
+        from .creator import Creator, CreatorDataWrapper
         url = "%s/%s" % (Creator.resource_url(), _id)
-        response = self._call(url)
-        return CreatorDataWrapper(self, response, **kwargs)
+        return self._get(CreatorDataWrapper, url, {}, **kwargs)
 
     def get_creators(self, **kwargs):
         """Fetches lists of creators.
@@ -192,8 +765,32 @@ class Marvel(object):
         Alvin Lee
         """
 
-        response = self._call(Creator.resource_url(), **kwargs)
-        return CreatorDataWrapper(self, response, **kwargs)
+        from .creator import Creator, CreatorDataWrapper
+        return self._get(CreatorDataWrapper, Creator.resource_url(), kwargs, **kwargs)
+
+    def get_creators_by_ids(self, ids, workers=None):
+        """Fetches many creators by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter creators by their own id, so each id is a
+        get /v1/public/creators/{id} call, run up to workers at a time.
+
+        :param ids: Creator ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Creator by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_creators_by_ids([30, 32, 1])
+        >>> print sorted(found), found.missing
+        [30, 32] [1]
+
+        """
+        from .creator import Creator
+        return self._get_by_ids(Creator.resource_url(), self.get_creator, ids, workers)
 
     def get_event(self, _id, **kwargs):
         """Fetches a single event by id.
@@ -211,9 +808,9 @@ class Marvel(object):
         Infinity Gauntlet
         """
 
+        from .event import Event, EventDataWrapper
         url = "%s/%s" % (Event.resource_url(), _id)
-        response = self._call(url)
-        return EventDataWrapper(self, response, **kwargs)
+        return self._get(EventDataWrapper, url, {}, **kwargs)
 
     def get_events(self, **kwargs):
         """Fetches lists of events.
@@ -234,8 +831,32 @@ class Marvel(object):
         Age of Apocalypse
         """
 
-        response = self._call(Event.resource_url(), **kwargs)
-        return EventDataWrapper(self, response, **kwargs)
+        from .event import Event, EventDataWrapper
+        return self._get(EventDataWrapper, Event.resource_url(), kwargs, **kwargs)
+
+    def get_events_by_ids(self, ids, workers=None):
+        """Fetches many events by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter events by their own id, so each id is a
+        get /v1/public/events/{id} call, run up to workers at a time.
+
+        :param ids: Event ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Event by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_events_by_ids([253, 116, 1])
+        >>> print sorted(found), found.missing
+        [116, 253] [1]
+
+        """
+        from .event import Event
+        return self._get_by_ids(Event.resource_url(), self.get_event, ids, workers)
 
     def get_single_series(self, _id, **kwargs):
         """Fetches a single comic series by id.
@@ -253,9 +874,9 @@ class Marvel(object):
         5 Ronin (2010)
         """
 
+        from .series import Series, SeriesDataWrapper
         url = "%s/%s" % (Series.resource_url(), _id)
-        response = self._call(url)
-        return SeriesDataWrapper(self, response, **kwargs)
+        return self._get(SeriesDataWrapper, url, {}, **kwargs)
 
     def get_series(self, **kwargs):
         """Fetches lists of events.
@@ -275,8 +896,32 @@ class Marvel(object):
         5 Ronin (2010)
         """
 
-        response = self._call(Series.resource_url(), **kwargs)
-        return SeriesDataWrapper(self, response, **kwargs)
+        from .series import Series, SeriesDataWrapper
+        return self._get(SeriesDataWrapper, Series.resource_url(), kwargs, **kwargs)
+
+    def get_series_by_ids(self, ids, workers=None):
+        """Fetches many series by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter series by their own id, so each id is a
+        get /v1/public/series/{id} call, run up to workers at a time.
+
+        :param ids: Series ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Series by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_series_by_ids([12429, 403, 1])
+        >>> print sorted(found), found.missing
+        [403, 12429] [1]
+
+        """
+        from .series import Series
+        return self._get_by_ids(Series.resource_url(), self.get_single_series, ids, workers)
 
     def get_story(self, _id, **kwargs):
         """Fetches a single story by id.
@@ -294,9 +939,9 @@ class Marvel(object):
         Caught in the heart of a nuclear explosion, mild-mannered scientist Bruce Banner finds himself...
         """
 
+        from .story import Story, StoryDataWrapper
         url = "%s/%s" % (Story.resource_url(), _id)
-        response = self._call(url)
-        return StoryDataWrapper(self, response, **kwargs)
+        return self._get(StoryDataWrapper, url, {}, **kwargs)
 
     def get_stories(self, **kwargs):
         """Fetches lists of stories.
@@ -317,5 +962,29 @@ class Marvel(object):
         Cover #477
         """
 
-        response = self._call(Story.resource_url(), **kwargs)
-        return StoryDataWrapper(self, response, **kwargs)
+        from .story import Story, StoryDataWrapper
+        return self._get(StoryDataWrapper, Story.resource_url(), kwargs, **kwargs)
+
+    def get_stories_by_ids(self, ids, workers=None):
+        """Fetches many stories by id.
+
+        Duplicate ids are fetched once, and cached responses and the
+        identity map are reused.
+        The API cannot filter stories by their own id, so each id is a
+        get /v1/public/stories/{id} call, run up to workers at a time.
+
+        :param ids: Story ids
+        :type ids: iterable
+        :param workers: Maximum number of concurrent calls, defaults to max_workers
+        :type workers: int
+
+        :returns:  BatchResult -- dict of Story by id, with missing ids in .missing
+
+        >>> m = Marvel(public_key, private_key)
+        >>> found = m.get_stories_by_ids([29, 30, 1])
+        >>> print sorted(found), found.missing
+        [29, 30] [1]
+
+        """
+        from .story import Story
+        return self._get_by_ids(Story.resource_url(), self.get_story, ids, workers)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Per-call instrumentation.
+
+Marvel reports every call to its on_call callbacks as a CallEvent.
+MetricsCollector is such a callback, aggregating events into counters
+and latency histograms that can be exported in the Prometheus text format.
+
+    >>> metrics = MetricsCollector()
+    >>> m = Marvel(public_key, private_key, on_call=metrics)
+    >>> metrics.latency.percentile(0.95, 'comics')
+    0.41
+    >>> print(metrics.to_prometheus())
+
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from .cache import AUTH_PARAMS, normalize_param
+from .exceptions import ApiError
+
+# Monotonic where available, for durations
+clock = getattr(time, 'perf_counter', time.time)
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def resource_name(resource_url):
+    """
+    Returns the endpoint of a resource url, with ids replaced so that
+    calls to the same endpoint are counted together.
+
+    >>> resource_name('characters/1009718/comics')
+    'characters/{id}/comics'
+
+    :returns: str
+    """
+    return '/'.join('{id}' if part.isdigit() else part for part in resource_url.split('/'))
+
+
+class CallEvent(object):
+
+    """
+    Report of a single call
+
+    Durations are in seconds. ttfb is the time from sending the request
+    to receiving the response headers, dns and connect the time spent
+    resolving the host and opening a connection. They are None when the
+    transport does not measure them: requests only reports ttfb, through
+    Response.elapsed, and calls served without a request have no timings.
+
+    cache is 'hit' when a fresh cached response was returned without a
+    request, 'revalidated' when the API answered 304 Not Modified, 'miss'
+    when the cache was consulted otherwise and None without a cache.
+    coalesced is True when the call shared the request of an identical
+    concurrent call, whose response its status_code and size describe.
+    """
+
+    __slots__ = ('resource_url', 'resource', 'params', 'timestamp', 'total', 'ttfb', 'dns',
+                 'connect', 'size', 'status_code', 'code', 'retries', 'cache', 'coalesced', 'error')
+
+    def __init__(self, call, total, body=None, error=None):
+        """
+        :param call: State of the finished call
+        :type call: marvel.marvel.Call
+        :param total: Duration of the call in seconds, retries and waits included
+        :type total: float
+        :param body: Decoded response, or raw content of a get_raw() call
+        :type body: dict
+        :param error: Exception raised by the call, if any
+        :type error: Exception
+        """
+        self.resource_url = call.resource_url
+        self.resource = resource_name(call.resource_url)
+        self.params = dict((k, normalize_param(v)) for k, v in call.params.items()
+                           if k not in AUTH_PARAMS and v is not None)
+        self.timestamp = time.time()
+        self.total = total
+        self.retries = max(call.attempts - 1, 0)
+        self.cache = call.cache_status
+        self.coalesced = call.attempts == 0 and call.body is None
+        self.error = error
+
+        response = call.response
+        timings = getattr(response, 'timings', None) or {}
+        elapsed = getattr(response, 'elapsed', None)
+        self.ttfb = timings.get('ttfb', elapsed.total_seconds() if elapsed is not None else None)
+        self.dns = timings.get('dns')
+        self.connect = timings.get('connect')
+        self.size = len(response.content or b'') if response is not None else None
+        self.status_code = response.status_code if response is not None else None
+
+        if isinstance(body, dict):
+            self.code = body.get('code')
+        elif isinstance(error, ApiError):
+            self.code = error.code
+        else:
+            self.code = None
+
+    def __repr__(self):
+        return '<CallEvent %s %s %.3fs>' % (self.resource_url, self.status_code, self.total)
+
+
+class Counter(object):
+
+    """
+    Thread-safe counter, with one value per combination of label values
+    """
+
+    def __init__(self, name, description, labels=()):
+        """
+        :param name: Metric name, e.g. 'marvel_calls_total'
+        :type name: str
+        :param description: Help text of the metric
+        :type description: str
+        :param labels: Label names
+        :type labels: tuple
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        label_values = tuple(label_values)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        """
+        :returns: int -- Value for label_values, 0 if never incremented
+        """
+        return self._values.get(tuple(label_values), 0)
+
+    def total(self):
+        """
+        :returns: int -- Sum over all label values
+        """
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self):
+        """
+        :returns: list -- (name, labels dict, value) tuples, sorted by label values
+        """
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labels, label_values)), value)
+                for label_values, value in items]
+
+
+class Histogram(object):
+
+    """
+    Thread-safe histogram of observed values, such as latencies, with one
+    series per combination of label values
+    """
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: Upper bounds of the buckets, an implicit +Inf bucket is added
+        :type buckets: tuple
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket, +Inf included], sum, count
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_values=()):
+        label_values = tuple(label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        series = self._series.get(tuple(label_values))
+        return series[2] if series else 0
+
+    def sum(self, *label_values):
+        series = self._series.get(tuple(label_values))
+        return series[1] if series else 0.0
+
+    def percentile(self, q, *label_values):
+        """
+        Estimates a percentile from the buckets, interpolating linearly
+        within the bucket it falls in, like Prometheus' histogram_quantile().
+
+        :param q: Percentile between 0 and 1, e.g. 0.95
+        :type q: float
+
+        :returns: float -- None without observations
+        """
+        with self._lock:
+            series = self._series.get(tuple(label_values))
+            counts = list(series[0]) if series else None
+        if not counts or not sum(counts):
+            return None
+        rank = q * sum(counts)
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    # Beyond the last bound
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def samples(self):
+        """
+        :returns: list -- (name, labels dict, value) tuples of the _bucket, _sum and _count series
+        """
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        samples = []
+        for label_values, (counts, total, count) in items:
+            labels = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                bucket_labels = dict(labels, le=_format_value(bound))
+                samples.append((self.name + '_bucket', bucket_labels, cumulative))
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, count))
+        return samples
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float):
+        return repr(value)
+    return '%s' % value
+
+
+def _escape(value):
+    return ('%s' % value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def prometheus_text(metrics):
+    """
+    Renders metrics in the Prometheus text exposition format.
+
+    :param metrics: Counter and Histogram instances
+    :type metrics: list
+
+    :returns: str
+    """
+    lines = []
+    for metric in metrics:
+        kind = 'histogram' if isinstance(metric, Histogram) else 'counter'
+        lines.append('# HELP %s %s' % (metric.name, _escape(metric.description)))
+        lines.append('# TYPE %s %s' % (metric.name, kind))
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ','.join('%s="%s"' % (k, _escape(labels[k])) for k in sorted(labels))
+                name = '%s{%s}' % (name, label_text)
+            lines.append('%s %s' % (name, _format_value(value)))
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsCollector(object):
+
+    """
+    on_call callback aggregating call events per endpoint
+
+    Counts calls by HTTP status, API code and cache outcome, errors by
+    exception type, retries and response bytes, and keeps histograms of
+    the total and time-to-first-byte latencies. Endpoints are resource
+    urls with ids replaced, e.g. 'characters/{id}/comics'.
+
+    >>> metrics = MetricsCollector()
+    >>> m = Marvel(public_key, private_key, on_call=metrics)
+    >>> metrics.calls.get('comics', '200', '200', 'miss')
+    12
+
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='marvel'):
+        """
+        :param buckets: Upper bounds in seconds of the latency histogram buckets
+        :type buckets: tuple
+        :param prefix: Prefix of the metric names
+        :type prefix: str
+        """
+        self.calls = Counter(prefix + '_calls_total', 'Calls by endpoint, HTTP status, API code and cache outcome.',
+                             ('resource', 'status', 'code', 'cache'))
+        self.errors = Counter(prefix + '_call_errors_total', 'Calls that raised, by endpoint and exception type.',
+                              ('resource', 'error'))
+        self.retries = Counter(prefix + '_retries_total', 'Retried attempts by endpoint.', ('resource',))
+        self.bytes = Counter(prefix + '_response_bytes_total', 'Bytes of response bodies received by endpoint.',
+                             ('resource',))
+        self.latency = Histogram(prefix + '_call_duration_seconds', 'Total duration of calls by endpoint.',
+                                 ('resource',), buckets)
+        self.ttfb = Histogram(prefix + '_call_ttfb_seconds', 'Time to the first byte of responses by endpoint.',
+                              ('resource',), buckets)
+
+    @property
+    def metrics(self):
+        return [self.calls, self.errors, self.retries, self.bytes, self.latency, self.ttfb]
+
+    def __call__(self, event):
+        """
+        Records a CallEvent.
+        """
+        resource = (event.resource,)
+        self.calls.inc((event.resource, _label(event.status_code), _label(event.code), _label(event.cache)))
+        if event.error is not None:
+            self.errors.inc((event.resource, type(event.error).__name__))
+        if event.retries:
+            self.retries.inc(resource, event.retries)
+        if event.size:
+            self.bytes.inc(resource, event.size)
+        self.latency.observe(event.total, resource)
+        if event.ttfb is not None:
+            self.ttfb.observe(event.ttfb, resource)
+
+    def to_prometheus(self):
+        """
+        :returns: str -- Every metric in the Prometheus text exposition format
+        """
+        return prometheus_text(self.metrics)
+
+
+def _label(value):
+    return '' if value is None else '%s' % value
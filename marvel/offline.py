@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from .marvel import Marvel
+from .transport import Transport
+from .cache import normalize_param
+from .export import NAME_FIELDS, sortable_datetime
+
+# Params matching a name prefix, per resource type
+STARTS_WITH = {
+    'nameStartsWith': "name LIKE ? ESCAPE '\\'",
+    'titleStartsWith': "name LIKE ? ESCAPE '\\'",
+    'firstNameStartsWith': "json_extract(body, '$.firstName') LIKE ? ESCAPE '\\'",
+    'middleNameStartsWith': "json_extract(body, '$.middleName') LIKE ? ESCAPE '\\'",
+    'lastNameStartsWith': "json_extract(body, '$.lastName') LIKE ? ESCAPE '\\'",
+}
+
+# Params matching a field of the resource exactly
+FIELDS = {
+    'format': 'format',
+    'startYear': 'startYear',
+    'issueNumber': 'issueNumber',
+    'diamondCode': 'diamondCode',
+    'digitalId': 'digitalId',
+    'upc': 'upc',
+    'isbn': 'isbn',
+    'ean': 'ean',
+    'issn': 'issn',
+    'seriesType': 'type',
+    'firstName': 'firstName',
+    'middleName': 'middleName',
+    'lastName': 'lastName',
+    'suffix': 'suffix',
+}
+
+# FIELDS holding numbers, compared as numbers so that issueNumber=1 matches 1.0
+NUMERIC_FIELDS = ('startYear', 'issueNumber', 'digitalId')
+
+# orderBy values and the SQL expression they sort by
+ORDER_BY = {
+    'id': "id",
+    'name': "name",
+    'title': "name",
+    'modified': "modified",
+    'startDate': "json_extract(body, '$.start')",
+    'startYear': "json_extract(body, '$.startYear')",
+    'issueNumber': "json_extract(body, '$.issueNumber')",
+    'firstName': "json_extract(body, '$.firstName')",
+    'middleName': "json_extract(body, '$.middleName')",
+    'lastName': "json_extract(body, '$.lastName')",
+    'suffix': "json_extract(body, '$.suffix')",
+    'focDate': "(SELECT json_extract(value, '$.date') FROM json_each(body, '$.dates') "
+               "WHERE json_extract(value, '$.type') = 'focDate')",
+    'onsaleDate': "(SELECT json_extract(value, '$.date') FROM json_each(body, '$.dates') "
+                  "WHERE json_extract(value, '$.type') = 'onsaleDate')",
+}
+
+MAX_LIMIT = 100
+
+
+class OfflineMarvel(Marvel):
+
+    """
+    Marvel client answering from a local SQLiteStore mirror
+
+    Takes the same get_* calls and params as Marvel and returns the same
+    DataWrappers, without any network call. Supported filters are the
+    name, title and prefix filters, modifiedSince, the related resource
+    filters (comics, characters, ...), which match resources related to
+    every given id, and exact matches on fields such as format or
+    startYear. Unsupported params get a 409 response, like
+    invalid params from the API.
+
+    >>> m = OfflineMarvel(SQLiteStore('mirror.db'))
+    >>> cdw = m.get_characters(nameStartsWith="Spider", orderBy="name,-modified", limit=5)
+
+    """
+
+    def __init__(self, store, **kwargs):
+        """
+        :param store: Store filled by Exporter
+        :type store: marvel.export.SQLiteStore
+        :param kwargs: Other Marvel params, e.g. identity_map
+        :type kwargs: dict
+        """
+        kwargs.setdefault('transport', Transport())
+        super(OfflineMarvel, self).__init__(None, None, **kwargs)
+        self.store = store
+
+    def _call(self, resource_url, **params):
+        """
+        Answers a call from the store.
+
+        :returns:  dict -- Response shaped like the API's
+        """
+        parts = resource_url.split('/')
+        resource = parts[0]
+        if resource not in NAME_FIELDS or len(parts) > 2:
+            return self._error(404, "We couldn't find that endpoint")
+        if len(parts) == 2:
+            rows = self.store.query(
+                "SELECT body FROM resources WHERE resource = ? AND id = ?", (resource, int(parts[1])))
+            if not rows:
+                return self._error(404, "We couldn't find that %s" % resource)
+            return self._response(0, 1, 1, rows)
+
+        try:
+            where, args = self._where(resource, params)
+            order = self._order(params.get('orderBy'))
+            limit = int(params.get('limit', 20))
+            offset = int(params.get('offset', 0))
+        except ValueError as error:
+            return self._error(409, '%s' % error)
+        if limit < 1 or limit > MAX_LIMIT:
+            return self._error(409, "You must pass an integer limit between 1 and %s." % MAX_LIMIT)
+
+        total = self.store.query("SELECT COUNT(*) FROM resources WHERE %s" % where, args)[0][0]
+        rows = self.store.query(
+            "SELECT body FROM resources WHERE %s ORDER BY %s LIMIT ? OFFSET ?" % (where, order),
+            args + [limit, offset])
+        return self._response(offset, limit, total, rows)
+
+    def _where(self, resource, params):
+        clauses = ["resource = ?"]
+        args = [resource]
+        for name, value in params.items():
+            if name in ('limit', 'offset', 'orderBy') or value is None:
+                continue
+            value = normalize_param(value)
+            if name in ('name', 'title'):
+                clauses.append("name = ?")
+                args.append(value)
+            elif name in STARTS_WITH:
+                clauses.append(STARTS_WITH[name])
+                args.append(self._escape_like(value) + '%')
+            elif name == 'modifiedSince':
+                since = sortable_datetime(value)
+                if since is None:
+                    raise ValueError("Invalid modifiedSince: %s" % value)
+                clauses.append("modified >= ?")
+                args.append(since)
+            elif name in NAME_FIELDS:
+                # Like the API, resources must be related to every id
+                ids = sorted(set(int(_id) for _id in value.split(',')))
+                clauses.append(
+                    "id IN (SELECT id FROM relations WHERE resource = ? AND related = ? "
+                    "AND related_id IN (%s) GROUP BY id HAVING COUNT(DISTINCT related_id) = ?)"
+                    % ', '.join('?' * len(ids)))
+                args.extend([resource, name] + ids + [len(ids)])
+            elif name in NUMERIC_FIELDS:
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise ValueError("Invalid %s: %s" % (name, value))
+                clauses.append("json_extract(body, '$.%s') = ?" % FIELDS[name])
+                args.append(number)
+            elif name in FIELDS:
+                clauses.append("CAST(json_extract(body, '$.%s') AS TEXT) = ?" % FIELDS[name])
+                args.append(value)
+            else:
+                raise ValueError("Unsupported offline param: %s" % name)
+        return ' AND '.join(clauses), args
+
+    def _order(self, order_by):
+        if isinstance(order_by, (list, tuple)):
+            order_by = ','.join(order_by)
+        terms = []
+        for field in (order_by or '').split(','):
+            if not field:
+                continue
+            descending = field.startswith('-')
+            field = field.lstrip('-')
+            if field not in ORDER_BY:
+                raise ValueError("Unsupported offline orderBy: %s" % field)
+            terms.append(ORDER_BY[field] + (' DESC' if descending else ''))
+        terms.append('id')
+        return ', '.join(terms)
+
+    def _escape_like(self, value):
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _response(self, offset, limit, total, rows):
+        results = [json.loads(row[0]) for row in rows]
+        return {'code': 200, 'status': 'Ok', 'etag': None,
+                'data': {'offset': offset, 'limit': limit, 'total': total,
+                         'count': len(results), 'results': results}}
+
+    def _error(self, code, status):
+        return {'code': code, 'status': status}
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .exceptions import RateLimitExceeded, QuotaExceeded
+
+# Calls per day allowed by the Marvel API for a single key
+DEFAULT_DAILY_LIMIT = 3000
+
+
+class TokenBucket(object):
+
+    """
+    Token bucket rate limiter
+
+    Holds up to capacity tokens, refilled at rate tokens per second.
+    Every API call takes one token. When the bucket is empty, calls wait
+    for the next token, or raise RateLimitExceeded if block is False or
+    the wait would exceed timeout.
+
+    >>> m = Marvel(public_key, private_key, rate_limiter=TokenBucket(rate=5, capacity=10))
+
+    """
+
+    def __init__(self, rate, capacity=None, block=True, timeout=None):
+        """
+        :param rate: Tokens added per second
+        :type rate: float
+        :param capacity: Maximum number of tokens, defaults to rate
+        :type capacity: float
+        :param block: Wait for a token instead of raising RateLimitExceeded
+        :type block: bool
+        :param timeout: Maximum seconds to wait for a token, None for no limit
+        :type timeout: float
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.block = block
+        self.timeout = timeout
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        """
+        Number of tokens currently available.
+
+        :returns: float
+        """
+        with self._lock:
+            self._refill()
+            return max(self._tokens, 0.0)
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Takes a token and returns how many seconds the caller must wait
+        before using it.
+
+        :returns: float -- Seconds to wait, 0 if a token was available
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait and (not self.block or (self.timeout is not None and wait > self.timeout)):
+                raise RateLimitExceeded("rate limit of %s calls per second reached" % self.rate)
+            self._tokens -= 1
+            return wait
+
+    def acquire(self):
+        """
+        Takes a token, waiting for it if needed.
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class DailyBudget(object):
+
+    """
+    Daily call budget of an API key
+
+    Counts calls per UTC day and raises QuotaExceeded once limit is reached.
+    With a path, the count is persisted in a json file shared by every
+    process using it, so several workers can share one key.
+
+    >>> budget = DailyBudget(limit=3000, path='/var/tmp/marvel-budget.json')
+    >>> m = Marvel(public_key, private_key, budget=budget)
+    >>> m.quota_remaining
+    2950
+
+    """
+
+    def __init__(self, limit=DEFAULT_DAILY_LIMIT, path=None):
+        """
+        :param limit: Calls allowed per day
+        :type limit: int
+        :param path: Optional json file the count is persisted to
+        :type path: str
+        """
+        self.limit = limit
+        self.path = path
+        self._day = None
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _today(self):
+        return datetime.datetime.utcnow().strftime('%Y-%m-%d')
+
+    def _update(self, calls):
+        """
+        Adds calls to today's count and returns the new count.
+        Raises QuotaExceeded instead if the count would pass limit.
+        """
+        with self._lock:
+            if self.path is None:
+                self._day, self._used = self._add(self._day, self._used, calls)
+                return self._used
+
+            with open(self.path, 'a+') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    content = f.read()
+                    state = json.loads(content) if content.strip() else {}
+                    day, used = self._add(state.get('day'), state.get('used', 0), calls)
+                    if calls:
+                        f.seek(0)
+                        f.truncate()
+                        json.dump({'day': day, 'used': used}, f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    return used
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _add(self, day, used, calls):
+        today = self._today()
+        if day != today:
+            day, used = today, 0
+        if calls and used + calls > self.limit:
+            raise QuotaExceeded("daily budget of %s calls used up" % self.limit)
+        return day, used + calls
+
+    def consume(self, calls=1):
+        """
+        Records calls against today's budget.
+
+        :raises: QuotaExceeded
+        """
+        self._update(calls)
+
+    @property
+    def used(self):
+        """
+        Calls made today.
+
+        :returns: int
+        """
+        return self._update(0)
+
+    @property
+    def remaining(self):
+        """
+        Calls left today.
+
+        :returns: int
+        """
+        return max(self.limit - self.used, 0)
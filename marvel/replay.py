@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+
+from .cache import cache_key
+from .transport import Transport, RequestsTransport, Response
+
+
+def resource_url(url):
+    """
+    Returns the url slug of an API url, e.g. 'comics/1308' for
+    'http://gateway.marvel.com/v1/public/comics/1308'.
+
+    :returns: str
+    """
+    return url.split('/public/', 1)[-1].strip('/')
+
+
+def fixture_path(directory, key):
+    """
+    :param key: Key created by cache_key()
+    :type key: str
+
+    :returns: str -- Path of the fixture file of a call
+    """
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, '%s-%s.json' % (key.split('?')[0].replace('/', '-'), digest))
+
+
+def save_fixture(directory, key, response):
+    """
+    Writes a response to its fixture file.
+
+    :param response: Response with status_code, headers and content
+    :type response: marvel.transport.Response
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    content = response.content.decode('utf-8')
+    headers = dict((k, v) for k, v in response.headers.items() if k.lower() == 'content-type')
+    etag = response.headers.get('ETag')
+    if etag is None and response.status_code == 200:
+        etag = json.loads(content).get('etag')
+    if etag:
+        headers['ETag'] = etag
+    fixture = {
+        'key': key,
+        'status_code': response.status_code,
+        'headers': headers,
+        'content': content,
+    }
+    path = fixture_path(directory, key)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(fixture, f, indent=1, sort_keys=True)
+    getattr(os, 'replace', os.rename)(path + '.tmp', path)
+
+
+def load_fixture(directory, key):
+    """
+    :returns: Response -- None if the call has no fixture
+    """
+    path = fixture_path(directory, key)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        fixture = json.load(f)
+    return Response(fixture['status_code'], fixture['headers'], fixture['content'].encode('utf-8'))
+
+
+class RecordingTransport(Transport):
+
+    """
+    Transport saving every response of another transport to a fixture file
+
+    Fixtures are keyed like cache entries, by resource and params without
+    the auth params, so they can be replayed with any key pair.
+
+    >>> m = Marvel(public_key, private_key, transport=RecordingTransport('fixtures'))
+    >>> cdw = m.get_characters(nameStartsWith='Spider')
+
+    """
+
+    def __init__(self, directory, transport=None):
+        """
+        :param directory: Directory of the fixture files, created if missing
+        :type directory: str
+        :param transport: Transport doing the calls. Defaults to RequestsTransport()
+        :type transport: marvel.transport.Transport
+        """
+        self.directory = directory
+        self.transport = transport or RequestsTransport()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = self.transport.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            save_fixture(self.directory, cache_key(resource_url(url), params or {}), response)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+
+    """
+    Transport answering calls from fixture files, without network access
+
+    A call without a fixture gets a 404 response. A matching
+    If-None-Match etag gets a 304 Not Modified.
+
+    >>> m = Marvel(public_key, private_key, transport=ReplayTransport('fixtures'))
+
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Directory of the fixture files
+        :type directory: str
+        """
+        self.directory = directory
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        key = cache_key(resource_url(url), params or {})
+        response = load_fixture(self.directory, key)
+        if response is None:
+            body = {'code': 404, 'status': 'No fixture for %s' % key}
+            return Response(404, {}, json.dumps(body).encode('utf-8'))
+        etag = response.headers.get('ETag')
+        if etag and (headers or {}).get('If-None-Match') == etag:
+            return Response(304, response.headers, b'')
+        return response
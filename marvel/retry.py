@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+# HTTP statuses worth another attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy(object):
+
+    """
+    Retry policy for transient failures
+
+    Failed attempts are retried with exponential backoff and full jitter,
+    honoring the Retry-After header of 429 and 503 responses. Only
+    idempotent methods are retried; every call of the Marvel API is a GET.
+
+    Retries are counted in retries and reported to on_retry, called as
+    on_retry(resource_url, attempt, delay, reason) where reason is the
+    HTTP status or the exception of the failed attempt.
+
+    >>> m = Marvel(public_key, private_key, retry=RetryPolicy(max_attempts=5, backoff=1))
+
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30, jitter=True,
+                 statuses=RETRY_STATUSES, errors=(IOError, ValueError),
+                 methods=('GET', 'HEAD', 'OPTIONS'), respect_retry_after=True, on_retry=None):
+        """
+        :param max_attempts: Maximum number of attempts, including the first one
+        :type max_attempts: int
+        :param backoff: Delay in seconds before the first retry, doubled on each retry
+        :type backoff: float
+        :param max_backoff: Maximum delay in seconds between attempts
+        :type max_backoff: float
+        :param jitter: Pick a random delay between 0 and the backoff
+        :type jitter: bool
+        :param statuses: HTTP statuses that are retried
+        :type statuses: tuple
+        :param errors: Exceptions that are retried: connection errors and timeouts \\
+            (IOError) and truncated bodies (ValueError) by default
+        :type errors: tuple
+        :param methods: Idempotent HTTP methods that may be retried
+        :type methods: tuple
+        :param respect_retry_after: Wait as long as the Retry-After header asks
+        :type respect_retry_after: bool
+        :param on_retry: Optional callback, called before every retry
+        :type on_retry: function
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.errors = errors
+        self.methods = frozenset(methods)
+        self.respect_retry_after = respect_retry_after
+        self.on_retry = on_retry
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def backoff_delay(self, attempt):
+        """
+        :param attempt: Number of the failed attempt, starting at 1
+        :type attempt: int
+
+        :returns: float -- Seconds to wait before the next attempt
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+    def retry_after(self, response):
+        """
+        Reads the Retry-After header, in seconds or as an HTTP date.
+
+        :returns: float -- Seconds to wait, None if the header is missing or invalid
+        """
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            date = parsedate_tz(value)
+            if date is None:
+                return None
+            return max(0.0, mktime_tz(date) - time.time())
+
+    def next_delay(self, resource_url, attempt, response=None, error=None, method='GET'):
+        """
+        Decides whether a failed attempt is retried.
+
+        :param resource_url: url slug of the resource
+        :type resource_url: str
+        :param attempt: Number of the attempt, starting at 1
+        :type attempt: int
+        :param response: Response of the attempt, if any
+        :param error: Exception raised by the attempt, if any
+        :type error: Exception
+
+        :returns: float -- Seconds to wait before retrying, None to not retry
+        """
+        if attempt >= self.max_attempts or method not in self.methods:
+            return None
+        if error is not None:
+            if not isinstance(error, self.errors):
+                return None
+            reason = error
+            delay = self.backoff_delay(attempt)
+        elif response is not None and response.status_code in self.statuses:
+            reason = response.status_code
+            delay = None
+            if self.respect_retry_after:
+                delay = self.retry_after(response)
+            if delay is None:
+                delay = self.backoff_delay(attempt)
+        else:
+            return None
+
+        with self._lock:
+            self.retries += 1
+        if self.on_retry is not None:
+            self.on_retry(resource_url, attempt, delay, reason)
+        return delay
@@ -3,12 +3,15 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
+from .core import cached_property
 from .structures import DataWrapper, DataItem, Image
 from .summaries import SeriesSummary
 
 
 class SeriesDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(SeriesDataWrapper, self).__init__(marvel, response, **params)
 
@@ -22,6 +25,7 @@ class Series(DataItem):
     Series object
     Takes a dict of character attrs
     """
+    __slots__ = ()
     _resource_url = 'series'
 
     @property
@@ -44,15 +48,15 @@ class Series(DataItem):
     def rating(self):
         return self.dict['rating']
 
-    @property
+    @cached_property
     def thumbnail(self):
         return Image(self.marvel, self.dict['thumbnail'])
 
-    @property
+    @cached_property
     def next(self):
         return SeriesSummary(self.marvel, self.dict['next'])
 
-    @property
+    @cached_property
     def previous(self):
         return SeriesSummary(self.marvel, self.dict['previous'])
 
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+
+class _Flight(object):
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+
+    """
+    Coalesces concurrent calls with the same key
+
+    While a call for a key is running, other threads calling do() with
+    that key wait for it and receive its result (or its exception)
+    instead of running the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs), unless a call for key is in flight,
+        in which case its result is returned.
+
+        :param key: Identifies equivalent calls
+        :type key: str
+
+        :returns: the result of func
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func(*args, **kwargs)
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    def __len__(self):
+        return len(self._flights)
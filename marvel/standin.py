@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the Marvel API, to run the client offline.
+
+Serves /v1/public/<resource> and /v1/public/<resource>/<id> with the
+API's offset/limit/total paging, from fixture files recorded with
+marvel.replay.RecordingTransport, synthetic data, or both.
+
+    python -m marvel.standin [port] [scale]
+
+"""
+
+import hashlib
+import json
+import sys
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+
+from .cache import AUTH_PARAMS, cache_key
+from .replay import load_fixture
+
+# Approximate size of each collection in the API
+DEFAULT_TOTALS = {
+    'characters': 1500,
+    'comics': 45000,
+    'creators': 5000,
+    'events': 75,
+    'series': 12000,
+    'stories': 100000,
+}
+
+SINGULAR = {
+    'characters': 'character',
+    'comics': 'comic',
+    'creators': 'creator',
+    'events': 'event',
+    'series': 'series',
+    'stories': 'story',
+}
+
+MAX_LIMIT = 100
+
+PREFIX = '/v1/public/'
+
+
+class SyntheticData(object):
+
+    """
+    Deterministic, API-shaped resources at a configurable scale
+
+    Resource ids run from 1 to the total of their collection, and every
+    resource lists related resources in its summaries, as the API does.
+
+    >>> data = SyntheticData(scale=0.1, related=20)
+    >>> data.item('comics', 42)['title']
+    'Comic 42'
+
+    """
+
+    def __init__(self, totals=None, scale=1.0, related=4):
+        """
+        :param totals: Size of each collection, defaults to DEFAULT_TOTALS
+        :type totals: dict
+        :param scale: Factor applied to every total
+        :type scale: float
+        :param related: Number of summaries in each related list
+        :type related: int
+        """
+        totals = totals or DEFAULT_TOTALS
+        self.totals = dict((resource, max(int(total * scale), 1)) for resource, total in totals.items())
+        self.related = related
+
+    def total(self, resource):
+        return self.totals.get(resource, 0)
+
+    def uri(self, resource, _id):
+        return 'http://gateway.marvel.com/v1/public/%s/%s' % (resource, _id)
+
+    def name(self, resource, _id):
+        return '%s %s' % (SINGULAR[resource].capitalize(), _id)
+
+    def modified(self, _id):
+        return '20%02d-%02d-%02dT%02d:%02d:%02d-0500' % (
+            10 + _id % 10, 1 + _id % 12, 1 + _id % 28, _id % 24, _id % 60, (_id * 7) % 60)
+
+    def summary(self, resource, _id):
+        summary = {'resourceURI': self.uri(resource, _id), 'name': self.name(resource, _id)}
+        if resource == 'stories':
+            summary['type'] = 'interiorStory'
+        if resource == 'creators':
+            summary['role'] = 'writer'
+        return summary
+
+    def summaries(self, resource, _id, related):
+        total = self.total(related)
+        ids = sorted(set((_id * 7919 + k * 104729) % total + 1 for k in range(self.related))) if total else []
+        return {
+            'available': len(ids),
+            'returned': len(ids),
+            'collectionURI': '%s/%s' % (self.uri(resource, _id), related),
+            'items': [self.summary(related, related_id) for related_id in ids],
+        }
+
+    def item(self, resource, _id):
+        """
+        :returns: dict -- The resource, None if _id is out of range
+        """
+        if not 1 <= _id <= self.total(resource):
+            return None
+        item = {
+            'id': _id,
+            'description': 'Description of %s' % self.name(resource, _id),
+            'modified': self.modified(_id),
+            'resourceURI': self.uri(resource, _id),
+            'urls': [{'type': 'detail', 'url': 'http://marvel.com/%s/%s' % (resource, _id)}],
+            'thumbnail': {'path': 'http://i.annihil.us/u/prod/marvel/i/mg/%s/%s' % (resource, _id),
+                          'extension': 'jpg'},
+        }
+        for related in DEFAULT_TOTALS:
+            if related != resource:
+                item[related] = self.summaries(resource, _id, related)
+
+        if resource == 'characters':
+            item['name'] = self.name(resource, _id)
+        elif resource == 'creators':
+            item.update(firstName='First%s' % _id, middleName='', lastName='Last%s' % _id,
+                        suffix='', fullName='First%s Last%s' % (_id, _id))
+        else:
+            item['title'] = self.name(resource, _id)
+
+        if resource == 'comics':
+            date = item['modified']
+            item.update(
+                digitalId=_id, issueNumber=float(_id % 500), variantDescription='', isbn='', upc='',
+                diamondCode='', ean='', issn='', format='Comic', pageCount=32,
+                textObjects=[{'type': 'issue_solicit_text', 'language': 'en-us',
+                              'text': 'Solicit text of %s' % item['title']}],
+                series=self.summary('series', _id % self.total('series') + 1) if self.total('series') else {},
+                variants=[], collections=[], collectedIssues=[],
+                dates=[{'type': 'onsaleDate', 'date': date}, {'type': 'focDate', 'date': date}],
+                prices=[{'type': 'printPrice', 'price': 3.99}],
+                images=[item['thumbnail']])
+        elif resource == 'events':
+            item.update(start='2010-01-01 00:00:00', end='2011-01-01 00:00:00',
+                        next=self.summary('events', _id % self.total('events') + 1),
+                        previous=self.summary('events', (_id - 2) % self.total('events') + 1))
+        elif resource == 'series':
+            item.update(startYear=2000 + _id % 20, endYear=2020, rating='T', type='ongoing',
+                        next=None, previous=None)
+        elif resource == 'stories':
+            item.update(type='interiorStory',
+                        originalIssue=self.summary('comics', _id % self.total('comics') + 1)
+                        if self.total('comics') else {})
+        return item
+
+    def page(self, resource, offset, limit):
+        """
+        :returns: dict -- data container of a list call
+        """
+        total = self.total(resource)
+        results = [self.item(resource, _id) for _id in range(offset + 1, min(offset + limit, total) + 1)]
+        return {'offset': offset, 'limit': limit, 'total': total, 'count': len(results), 'results': results}
+
+
+def query_params(query):
+    """
+    Parses a query string into params that give the same cache_key() as
+    those of the call that sent it: repeated params, as requests sends
+    lists, are joined with commas in their order, and the 'True' and
+    'False' requests sends for bools are lowercased.
+
+    >>> query_params('orderBy=title&orderBy=-modified&hasDigitalIssue=True')
+    {'orderBy': 'title,-modified', 'hasDigitalIssue': 'true'}
+
+    :returns: dict
+    """
+    params = {}
+    for name, value in parse_qsl(query):
+        if value in ('True', 'False'):
+            value = value.lower()
+        params[name] = '%s,%s' % (params[name], value) if name in params else value
+    return params
+
+
+class StandInServer(object):
+
+    """
+    Local HTTP server standing in for the Marvel API
+
+    Fixtures, if any, are served first, and other calls are answered with
+    synthetic data. Auth params are accepted and ignored. Point a client
+    at it with the endpoint param:
+
+    >>> with StandInServer(SyntheticData(scale=0.1)) as server:
+    ...     m = Marvel(public_key, private_key, endpoint=server.endpoint)
+    ...     comics = m.get_comics(limit=100).fetch_all(workers=8)
+
+    """
+
+    def __init__(self, data=None, fixtures=None, host='127.0.0.1', port=0):
+        """
+        :param data: Synthetic data, None to serve fixtures only
+        :type data: marvel.standin.SyntheticData
+        :param fixtures: Directory of fixture files recorded with RecordingTransport
+        :type fixtures: str
+        :param host: Interface to listen on
+        :type host: str
+        :param port: Port to listen on, 0 for any free port
+        :type port: int
+        """
+        self.data = data
+        self.fixtures = fixtures
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        """
+        :returns: str -- Base url to pass to Marvel(endpoint=...)
+        """
+        return 'http://%s:%s%s' % (self.host, self.port, PREFIX)
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        :returns: StandInServer -- self
+        """
+        self._server = _ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.standin = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path, params, headers=None):
+        """
+        Answers a GET request.
+
+        :param path: Path of the request, e.g. '/v1/public/comics'
+        :type path: str
+        :param params: Query params
+        :type params: dict
+        :param headers: Request headers, read with get()
+        :type headers: dict
+
+        :returns: tuple -- status code, headers, content
+        """
+        if not path.startswith(PREFIX):
+            return self._json(404, {'code': 404, 'status': "We couldn't find that endpoint"})
+        resource_url = path[len(PREFIX):].strip('/')
+        params = dict((k, v) for k, v in params.items() if k not in AUTH_PARAMS)
+
+        if self.fixtures is not None:
+            response = load_fixture(self.fixtures, cache_key(resource_url, params))
+            if response is not None:
+                return self._etagged(response.status_code, response.headers.get('ETag'),
+                                     response.content, headers)
+        if self.data is None:
+            return self._json(404, {'code': 404, 'status': 'No fixture for %s' % resource_url})
+        return self._synthetic(resource_url, params, headers)
+
+    def _synthetic(self, resource_url, params, headers):
+        parts = resource_url.split('/')
+        resource = parts[0]
+        if resource not in SINGULAR or len(parts) > 2:
+            return self._json(404, {'code': 404, 'status': "We couldn't find that endpoint"})
+
+        if len(parts) == 2:
+            item = self.data.item(resource, int(parts[1])) if parts[1].isdigit() else None
+            if item is None:
+                return self._json(404, {'code': 404, 'status': "We couldn't find that %s" % SINGULAR[resource]})
+            data = {'offset': 0, 'limit': 20, 'total': 1, 'count': 1, 'results': [item]}
+        else:
+            try:
+                limit = int(params.get('limit', 20))
+                offset = int(params.get('offset', 0))
+            except ValueError:
+                return self._json(409, {'code': 409, 'status': 'You must pass an integer limit and offset.'})
+            if limit > MAX_LIMIT:
+                return self._json(409, {'code': 409, 'status': 'You may not request more than 100 items.'})
+            if limit < 1:
+                return self._json(409, {'code': 409, 'status': 'You must pass an integer limit greater than 0.'})
+            data = self.data.page(resource, offset, limit)
+
+        etag = hashlib.md5(cache_key(resource_url, params).encode('utf-8')).hexdigest()
+        body = {'code': 200, 'status': 'Ok', 'etag': etag,
+                'attributionText': 'Data provided by Marvel. (c) 2014 Marvel', 'data': data}
+        return self._etagged(200, etag, json.dumps(body).encode('utf-8'), headers)
+
+    def _etagged(self, status, etag, content, headers):
+        response_headers = {'Content-Type': 'application/json; charset=utf-8'}
+        if etag:
+            response_headers['ETag'] = etag
+            if (headers or {}).get('If-None-Match') == etag:
+                return 304, response_headers, b''
+        return status, response_headers, content
+
+    def _json(self, status, body):
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, json.dumps(body).encode('utf-8')
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, delayed
+    # acks stall every keep-alive response by ~40ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        status, headers, content = self.server.standin.respond(
+            url.path, query_params(url.query), self.headers)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    server = StandInServer(SyntheticData(scale=scale), port=port).start()
+    print('Serving the Marvel API stand-in at %s' % server.endpoint)
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -3,12 +3,15 @@
 __author__ = 'Garrett Pennington'
 __date__ = '02/07/14'
 
+from .core import cached_property
 from .structures import DataWrapper, DataItem, Image
 from .summaries import ComicSummary
 
 
 class StoryDataWrapper(DataWrapper):
 
+    __slots__ = ()
+
     def __init__(self, marvel, response, **params):
         super(StoryDataWrapper, self).__init__(marvel, response, **params)
 
@@ -22,6 +25,7 @@ class Story(DataItem):
     Story object
     Takes a dict of character attrs
     """
+    __slots__ = ()
     _resource_url = 'stories'
 
     @property
@@ -32,11 +36,11 @@ class Story(DataItem):
     def type(self):
         return self.dict['type']
 
-    @property
+    @cached_property
     def thumbnail(self):
         return Image(self.marvel, self.dict['thumbnail'])
 
-    @property
+    @cached_property
     def originalIssue(self):
         return ComicSummary(self.marvel, self.dict['originalIssue'])
 
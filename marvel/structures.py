@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from .core import MarvelObject
+from .core import MarvelObject, cached_property, parse_datetime
 from .summaries import CharacterSummary, ComicSummary, CreatorSummary, EventSummary, SeriesSummary, StorySummary
 
 
@@ -11,8 +11,9 @@ class DataWrapper(MarvelObject):
 
     item_class and getter are set by child classes
     """
+    __slots__ = ('item_class', 'getter')
 
-    @property
+    @cached_property
     def data(self):
         return DataContainer(self.marvel, self.dict['data'], self.item_class)
 
@@ -20,6 +21,7 @@ class DataWrapper(MarvelObject):
         """
         Returns new DataWrapper
         Returns None if max has been reached
+        (awaitable when called through AsyncMarvel)
 
         :param method: A method in the Marvel class to run (e.g. get_comics)
         :type function
@@ -27,16 +29,16 @@ class DataWrapper(MarvelObject):
 
         # Don't run on a non-successful request
         if self.code != 200:
-            return
+            return self.marvel._result(None)
 
         # Don't run if count is 0
         if self.data.count == 0:
-            return
+            return self.marvel._result(None)
 
         # Don't run if number requested is less than limit requested (at the
         # end)
         if self.data.count < self.data.limit:
-            return
+            return self.marvel._result(None)
 
         params = dict((k, v) for k, v in self.params.items())
         params['offset'] = self.data.offset + self.data.count
@@ -44,7 +46,7 @@ class DataWrapper(MarvelObject):
 
         # don't send request if we're past the top
         if params['offset'] > self.data.total:
-            return
+            return self.marvel._result(None)
 
         return self.getter(**params)
 
@@ -52,13 +54,14 @@ class DataWrapper(MarvelObject):
         """
         Returns new DataWrapper
         returns None if offset is already 0
+        (awaitable when called through AsyncMarvel)
 
         :param method: A method in the Marvel class to run (e.g. get_comics)
         :type function
         """
         # Don't run on a non-successful request
         if self.code != 200:
-            return
+            return self.marvel._result(None)
 
         params = dict((k, v) for k, v in self.params.items())
         params['offset'] = max(self.data.offset - self.data.count, 0)
@@ -66,10 +69,81 @@ class DataWrapper(MarvelObject):
 
         # don't send request if we're at the bottom
         if self.data.offset <= 0:
-            return
+            return self.marvel._result(None)
 
         return self.getter(**params)
 
+    def page_params(self, **kwargs):
+        """
+        Returns the params of every page after this one, in offset order,
+        computed from data.offset, data.count, data.limit and data.total.
+
+        :returns: list -- List of params dicts for getter
+        """
+        if self.code != 200 or self.data.count == 0:
+            return []
+
+        pages = []
+        for offset in range(self.data.offset + self.data.count, self.data.total, self.data.limit):
+            params = dict((k, v) for k, v in self.params.items())
+            params['offset'] = offset
+            params.update(kwargs)  # passed arguments override params
+            pages.append(params)
+        return pages
+
+    def fetch_all(self, workers=4, **kwargs):
+        """
+        Fetches all remaining pages concurrently and returns the results
+        of this page and every following page, in offset order.
+        (awaitable when called through AsyncMarvel)
+
+        >>> cdw = m.get_characters(limit=100)
+        >>> characters = cdw.fetch_all(workers=8)
+
+        :param workers: Maximum number of pages fetched at once
+        :type workers: int
+
+        :returns: list -- List of Resource instances (Comic, Creator, etc).
+        """
+        return self.marvel._fetch_all(self, self.page_params(**kwargs), workers)
+
+    def iter_results(self, prefetch=2, **kwargs):
+        """
+        Iterates over the results of this page and every following page.
+        The next prefetch pages are fetched in the background while the
+        current page is consumed, so at most prefetch + 1 pages are held at once.
+        (async iterator when called through AsyncMarvel)
+
+        >>> for comic in m.get_comics(characters=1009718, limit=100).iter_results():
+        ...     print comic.title
+
+        :param prefetch: Number of pages fetched ahead, at least 1
+        :type prefetch: int
+
+        :returns: iterator -- Resource instances (Comic, Creator, etc).
+        """
+        return self.marvel._iter_results(self, self.page_params(**kwargs), max(prefetch, 1))
+
+    def fetch_columns(self, fields, workers=4, backend=None, **kwargs):
+        """
+        Fetches all remaining pages concurrently and returns typed columns
+        of fields over the results of every page, without creating
+        resource instances. See marvel.columns.to_columns.
+        (awaitable when called through AsyncMarvel)
+
+        >>> columns = m.get_comics(limit=100).fetch_columns(['id', 'issueNumber', 'modified'])
+
+        :param fields: Field names, dotted for nested fields (e.g. 'prices.printPrice')
+        :type fields: list
+        :param workers: Maximum number of pages fetched at once
+        :type workers: int
+        :param backend: 'numpy', 'arrow' or 'array'
+        :type backend: str
+
+        :returns: OrderedDict -- Arrays keyed by field
+        """
+        return self.marvel._fetch_columns(self, self.page_params(**kwargs), fields, workers, backend)
+
     @property
     def code(self):
         """
@@ -103,6 +177,7 @@ class DataContainer(MarvelObject):
     """
     Base DataContainer
     """
+    __slots__ = ('item_class',)
 
     def __init__(self, marvel, response, item_class):
         """
@@ -116,9 +191,51 @@ class DataContainer(MarvelObject):
         super(DataContainer, self).__init__(marvel, response)
         self.item_class = item_class
 
-    @property
+    @cached_property
     def results(self):
-        return self.list_to_instance_list(self.dict.get('results'), self.item_class)
+        results = self.list_to_instance_list(self.dict.get('results'), self.item_class)
+        identity_map = getattr(self.marvel, 'identity_map', None)
+        if identity_map is not None:
+            results = [identity_map.add(item) for item in results]
+        return results
+
+    def to_columns(self, fields, backend=None):
+        """
+        Returns typed columns of fields built straight from the result
+        dicts, without creating resource instances. See marvel.columns.to_columns.
+
+        >>> columns = cdw.data.to_columns(['id', 'pageCount', 'prices.printPrice'])
+
+        :param fields: Field names, dotted for nested fields (e.g. 'prices.printPrice')
+        :type fields: list
+        :param backend: 'numpy', 'arrow' or 'array'
+        :type backend: str
+
+        :returns: OrderedDict -- Arrays keyed by field
+        """
+        from .columns import to_columns
+        return to_columns(self.dict.get('results') or [], fields, backend)
+
+    def parse_datetimes(self):
+        """
+        Parses the timestamps of every result (modified, Event.start/end,
+        ComicDate.date) in one pass, parsing each distinct value once,
+        and caches them on the results.
+
+        :returns: list -- results
+        """
+        parsed = {}
+
+        def parse(_str):
+            try:
+                return parsed[_str]
+            except KeyError:
+                value = parsed[_str] = parse_datetime(_str)
+                return value
+
+        for item in self.results:
+            item._prime_datetimes(parse)
+        return self.results
 
     @property
     def offset(self):
@@ -169,11 +286,14 @@ class DataContainer(MarvelObject):
 
 class DataItem(MarvelObject):
 
+    __slots__ = ('__weakref__',)
+    _datetime_fields = ('modified',)
+
     @property
     def id(self):
         return int(self.dict.get('id'))
 
-    @property
+    @cached_property
     def modified(self):
         return self.str_to_datetime(self.dict.get('modified'))
 
@@ -189,27 +309,27 @@ class DataItem(MarvelObject):
     def resourceURI(self):
         return self.dict.get('resourceURI')
 
-    @property
+    @cached_property
     def characters(self):
         return ListWrapper(self.marvel, self.dict.get('characters'), CharacterSummary)
 
-    @property
+    @cached_property
     def comics(self):
         return ListWrapper(self.marvel, self.dict.get('comics'), ComicSummary)
 
-    @property
+    @cached_property
     def events(self):
         return ListWrapper(self.marvel, self.dict.get('events'), EventSummary)
 
-    @property
+    @cached_property
     def creators(self):
         return ListWrapper(self.marvel, self.dict.get('creators'), CreatorSummary)
 
-    @property
+    @cached_property
     def series(self):
         return ListWrapper(self.marvel, self.dict.get('series'), SeriesSummary)
 
-    @property
+    @cached_property
     def stories(self):
         return ListWrapper(self.marvel, self.dict.get('stories'), StorySummary)
 
@@ -261,6 +381,7 @@ class ListWrapper(MarvelObject):
     """
     Base List object
     """
+    __slots__ = ('_class',)
 
     def __init__(self, marvel, items, _class):
         """
@@ -275,6 +396,8 @@ class ListWrapper(MarvelObject):
         self.marvel = marvel
         self.dict = items or dict()
         self._class = _class
+        self._params = None
+        self._cache = None
 
     @property
     def available(self):
@@ -285,7 +408,7 @@ class ListWrapper(MarvelObject):
         """
         return int(self.dict.get('available'))
 
-    @property
+    @cached_property
     def items(self):
         """
         Returns List of StorySummary objects
@@ -313,6 +436,8 @@ class ListWrapper(MarvelObject):
 
 class TextObject(MarvelObject):
 
+    __slots__ = ()
+
     @property
     def type(self):
         """
@@ -343,6 +468,8 @@ class TextObject(MarvelObject):
 
 class Image(MarvelObject):
 
+    __slots__ = ()
+
     @property
     def path(self):
         """
@@ -363,3 +490,15 @@ class Image(MarvelObject):
 
     def __repr__(self):
         return "%s.%s" % (self.path, self.extension)
+
+
+class BatchResult(dict):
+
+    """
+    Resources fetched by id, keyed by id.
+    Ids the API could not find are listed in missing.
+    """
+
+    def __init__(self, items=(), missing=()):
+        super(BatchResult, self).__init__(items)
+        self.missing = list(missing)
@@ -7,6 +7,7 @@ class Summary(MarvelObject):
     """
     Base Summary object
     """
+    __slots__ = ()
 
     @property
     def resourceURI(self):
@@ -31,8 +32,12 @@ class Summary(MarvelObject):
         return self.dict['name']
 
     def get(self, **kwargs):
-        kwargs['id'] = self.id
-        return self.get_related_resource(self.getter, **kwargs)
+        """
+        Fetches the full resource.
+
+        :returns:  DataWrapper -- A new request to API (e.g. CharacterDataWrapper)
+        """
+        return self.getter(self.id, **kwargs)
 
 
 class CharacterSummary(Summary):
@@ -40,6 +45,7 @@ class CharacterSummary(Summary):
     """
     CharacterSummary object
     """
+    __slots__ = ()
     _resource_url = 'characters'
 
     @property
@@ -56,6 +62,7 @@ class ComicSummary(Summary):
     """
     CommicSummary object
     """
+    __slots__ = ()
     _resource_url = 'comics'
 
     @property
@@ -68,6 +75,7 @@ class CreatorSummary(Summary):
     """
     CreatorSummary object
     """
+    __slots__ = ()
 
     _resource_url = 'creators'
 
@@ -85,6 +93,7 @@ class EventSummary(Summary):
     """
     EventSummary object
     """
+    __slots__ = ()
     _resource_url = 'events'
 
     @property
@@ -97,6 +106,7 @@ class SeriesSummary(Summary):
     """
     SeriesSummary object
     """
+    __slots__ = ()
     _resource_url = 'series'
 
     @property
@@ -109,6 +119,7 @@ class StorySummary(Summary):
     """
     StorySummary object
     """
+    __slots__ = ()
     _resource_url = 'stories'
 
     @property
@@ -1,5 +1,7 @@
 "python -m unittest marvel.tests"
 
+from __future__ import print_function
+
 import unittest
 
 from .marvel import Marvel
@@ -8,10 +10,41 @@ from .summaries import CharacterSummary, ComicSummary, CreatorSummary, EventSumm
 from .character import CharacterDataWrapper
 from .story import Story
 from .event import EventDataWrapper, Event
-from .comic import ComicDataWrapper, ComicDate, ComicPrice, TextObject
+from .comic import ComicDataWrapper, Comic, ComicDate, ComicPrice, TextObject
 from .config import *
-
-from datetime import datetime
+from .core import FixedOffset, parse_datetime
+from .transport import Transport
+from .cache import ResponseCache, SQLiteCache, cache_key
+from .ratelimit import TokenBucket, DailyBudget
+from .exceptions import RateLimitExceeded, QuotaExceeded
+from .retry import RetryPolicy
+from .crawler import Crawler
+from .identity import IdentityMap
+from .export import Exporter, JSONLStore, SQLiteStore, sortable_datetime
+from .offline import OfflineMarvel
+from .columns import INT_TYPECODE, numpy, pyarrow, to_columns
+from .decoder import get_decoder, json_loads
+from .replay import RecordingTransport, ReplayTransport
+from .standin import StandInServer, SyntheticData
+from .metrics import MetricsCollector
+from .exceptions import ApiError
+
+try:
+    import asyncio
+    from .aio import AsyncMarvel, query_pairs
+except (ImportError, SyntaxError):
+    AsyncMarvel = None
+
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 
 
 class PyMarvelTestCase(unittest.TestCase):
@@ -51,8 +84,8 @@ class PyMarvelTestCase(unittest.TestCase):
         assert self.character_dw.status == 'Ok'
         assert self.character.name == "Wolverine"
 
-        print "\nMarvel.get_character(): \n"
-        print self.character.name
+        print("\nMarvel.get_character(): \n")
+        print(self.character.name)
 
     def test_character_get_comics(self):
 
@@ -61,9 +94,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert comic_dw.code == 200
         assert comic_dw.status == 'Ok'
 
-        print "\nCharacter.get_comics(): \n"
+        print("\nCharacter.get_comics(): \n")
         for c in comic_dw.data.results:
-            print "%s - %s" % (c.id, c.title)
+            print("%s - %s" % (c.id, c.title))
 
         comic_dw_params = self.character.get_comics(
             format="comic", formatType="comic", hasDigitalIssue=True, orderBy="title", limit=10, offset=30)
@@ -71,9 +104,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert comic_dw_params.code == 200
         assert comic_dw_params.status == 'Ok'
 
-        print "\nCharacter.get_comics(params): \n"
+        print("\nCharacter.get_comics(params): \n")
         for c in comic_dw_params.data.results:
-            print "%s - %s" % (c.id, c.title)
+            print("%s - %s" % (c.id, c.title))
 
     def test_character_get_events(self):
 
@@ -82,9 +115,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert events_dw.code == 200
         assert events_dw.status == 'Ok'
 
-        print "\nCharacter.get_events(): \n"
+        print("\nCharacter.get_events(): \n")
         for e in events_dw.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
         events_dw_params = self.character.get_events(
             orderBy="startDate", limit=10)
@@ -92,9 +125,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert events_dw_params.code == 200
         assert events_dw_params.status == 'Ok'
 
-        print "\nCharacter.get_events(params): \n"
+        print("\nCharacter.get_events(params): \n")
         for e in events_dw_params.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
     def test_get_characters(self):
 
@@ -113,9 +146,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert type(characters_dw.data) is DataContainer
         assert type(characters_dw.data.results) is list
 
-        print "\nMarvel.get_characters():\n"
+        print("\nMarvel.get_characters():\n")
         for c in characters_dw.data.results:
-            print "%s - %s" % (c.id, c.name)
+            print("%s - %s" % (c.id, c.name))
 
     def test_get_characters_next(self):
 
@@ -169,21 +202,25 @@ class PyMarvelTestCase(unittest.TestCase):
         assert isinstance(self.comic_dw.data.result.events, ListWrapper)
         assert isinstance(self.comic_dw.data.result.events.items[0], EventSummary)
 
-        print "\nMarvel.get_comic(): \n"
-        print self.comic.title
+        print("\nMarvel.get_comic(): \n")
+        print(self.comic.title)
 
     def test_parse_date(self):
 
         cdw = self.m.get_comics(dateRange='2013-03-13,2013-03-13', limit=1)
 
-        assert cdw.data.results[0].dates[0].date == datetime.strptime(
-            cdw.data.results[0].dates[0].date_raw[:-5], '%Y-%m-%dT%H:%M:%S')
+        date = cdw.data.results[0].dates[0]
+        assert date.date.replace(tzinfo=None) == datetime.strptime(
+            date.date_raw[:-5], '%Y-%m-%dT%H:%M:%S')
+        assert date.date.strftime('%z') == date.date_raw[-5:]
         assert cdw.data.results[0].dates[0].type == u'onsaleDate'
 
-        assert cdw.data.results[0].modified == datetime.strptime(
+        modified = cdw.data.results[0].modified
+        assert modified.replace(tzinfo=None) == datetime.strptime(
             cdw.data.results[0].modified_raw[:-5], '%Y-%m-%dT%H:%M:%S')
+        assert modified.strftime('%z') == cdw.data.results[0].modified_raw[-5:]
 
-        print "Checked dates.\n"
+        print("Checked dates.\n")
 
     def test_comic_get_events(self):
 
@@ -192,18 +229,18 @@ class PyMarvelTestCase(unittest.TestCase):
         assert events_dw.code == 200
         assert events_dw.status == 'Ok'
 
-        print "\nComic.get_events(): \n"
+        print("\nComic.get_events(): \n")
         for e in events_dw.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
         events_dw_params = self.comic.get_events(orderBy="startDate", limit=1)
 
         assert events_dw_params.code == 200
         assert events_dw_params.status == 'Ok'
 
-        print "\nComic.get_events(params): \n"
+        print("\nComic.get_events(params): \n")
         for e in events_dw_params.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
     def test_get_comics(self):
         cdw = self.m.get_comics(
@@ -222,7 +259,7 @@ class PyMarvelTestCase(unittest.TestCase):
         assert type(cdw.data.results) is list
 
         for c in cdw.data.results:
-            print "%s - %s" % (c.id, c.title)
+            print("%s - %s" % (c.id, c.title))
 
         # chain with params
         cdw2 = cdw.next()
@@ -231,10 +268,10 @@ class PyMarvelTestCase(unittest.TestCase):
             assert int(cdw2.data.offset) == int(cdw2.params.get('offset'))
             assert int(cdw2.data.limit) == int(cdw2.params.get('limit'))
         except:
-            print "cdw2.data.offset", cdw2.data.offset
-            print "cdw2.params.get('offset')",  cdw2.params.get('offset')
-            print "cdw2.data.limit", cdw2.data.limit
-            print "cdw2.params.get('limit')", cdw2.params.get('limit')
+            print("cdw2.data.offset", cdw2.data.offset)
+            print("cdw2.params.get('offset')",  cdw2.params.get('offset'))
+            print("cdw2.data.limit", cdw2.data.limit)
+            print("cdw2.params.get('limit')", cdw2.params.get('limit'))
 
         # should be limit + offset from original get
         try:
@@ -265,9 +302,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert comic_dw.code == 200
         assert comic_dw.status == 'Ok'
 
-        print "\nCreator.get_comics(): \n"
+        print("\nCreator.get_comics(): \n")
         for c in comic_dw.data.results:
-            print "%s - %s" % (c.id, c.title)
+            print("%s - %s" % (c.id, c.title))
 
         comic_dw_params = self.creator.get_comics(
             format="comic", formatType="comic", hasDigitalIssue=True, orderBy="title", limit=10, offset=30)
@@ -275,9 +312,9 @@ class PyMarvelTestCase(unittest.TestCase):
         assert comic_dw_params.code == 200
         assert comic_dw_params.status == 'Ok'
 
-        print "\nCreator.get_comics(params): \n"
+        print("\nCreator.get_comics(params): \n")
         for c in comic_dw_params.data.results:
-            print "%s - %s" % (c.id, c.title)
+            print("%s - %s" % (c.id, c.title))
 
     def test_creator_get_events(self):
 
@@ -286,18 +323,18 @@ class PyMarvelTestCase(unittest.TestCase):
         assert events_dw.code == 200
         assert events_dw.status == 'Ok'
 
-        print "\nCreator.get_events(): \n"
+        print("\nCreator.get_events(): \n")
         for e in events_dw.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
         events_dw_params = self.creator.get_events(orderBy="startDate")
 
         assert events_dw_params.code == 200
         assert events_dw_params.status == 'Ok'
 
-        print "\nCreator.get_events(params): \n"
+        print("\nCreator.get_events(params): \n")
         for e in events_dw_params.data.results:
-            print "%s - %s" % (e.id, e.title)
+            print("%s - %s" % (e.id, e.title))
 
     def test_get_event(self):
         event_dw = self.m.get_event(253)
@@ -305,12 +342,12 @@ class PyMarvelTestCase(unittest.TestCase):
         assert event_dw.code == 200
         assert event_dw.status == 'Ok'
 
-        print "\nMarvel.get_event: \n"
+        print("\nMarvel.get_event: \n")
         event = event_dw.data.result
         assert isinstance(event, Event)
         assert event.title == "Infinity Gauntlet"
-        print event.title
-        print event.description
+        print(event.title)
+        print(event.description)
 
     def test_get_events(self):
         response = self.m.get_events(characters="1009351,1009718")
@@ -320,9 +357,9 @@ class PyMarvelTestCase(unittest.TestCase):
 
         assert response.data.total > 0
 
-        print "\nMarvel.get_events(): \n"
+        print("\nMarvel.get_events(): \n")
         for e in response.data.results:
-            print "%s" % e.title
+            print("%s" % e.title)
 
     def test_get_single_series(self):
 
@@ -330,8 +367,8 @@ class PyMarvelTestCase(unittest.TestCase):
         assert self.series_dw.status == 'Ok'
         assert self.series.title == "5 Ronin (2010)"
 
-        print "\nMarvel.get_single_series(): \n"
-        print self.series.title
+        print("\nMarvel.get_single_series(): \n")
+        print(self.series.title)
 
     def test_get_series(self):
 
@@ -342,18 +379,18 @@ class PyMarvelTestCase(unittest.TestCase):
 
         assert response.data.total > 0
 
-        print "\nMarvel.get_series(): \n"
+        print("\nMarvel.get_series(): \n")
         for s in response.data.results:
-            print "%s" % s.title
+            print("%s" % s.title)
 
     def test_get_story(self):
 
         assert self.story_dw.code == 200
         assert self.story_dw.status == 'Ok'
 
-        print "\nMarvel.get_story(): \n"
+        print("\nMarvel.get_story(): \n")
         assert isinstance(self.story, Story)
-        print self.story.title
+        print(self.story.title)
 
     def test_get_stories(self):
 
@@ -363,17 +400,1064 @@ class PyMarvelTestCase(unittest.TestCase):
         assert response.status == 'Ok'
         assert response.data.total > 0
 
-        print "\nMarvel.get_events(): \n"
+        print("\nMarvel.get_events(): \n")
         for s in response.data.results:
-            print "%s" % s.title
+            print("%s" % s.title)
 
     def test_chain(self):
-        print "\nMethod Chaining:\n"
+        print("\nMethod Chaining:\n")
         events = self.m.get_series(characters="1009718").data.result.get_characters().data.results[
             1].get_comics().data.result.get_creators().data.result.get_events()
         assert isinstance(events, EventDataWrapper)
         assert isinstance(events.data.result, Event)
-        print events.data.result.title
+        print(events.data.result.title)
+
+
+class FakeResponse(object):
+
+    def __init__(self, body, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(body).encode('utf-8') if body is not None else b''
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class FakeTransport(Transport):
+
+    """
+    Serves paged, synthetic results for any list resource without network access.
+    """
+
+    def __init__(self, total=95, missing=()):
+        self.total = total
+        self.missing = missing
+        self.failures = []
+        self.delay = 0
+        self.calls = []
+        self.closed = False
+
+    def item(self, resource, _id):
+        return {'id': _id, 'name': 'Item %s' % _id, 'title': 'Item %s' % _id,
+                'modified': '2014-01-15T19:43:09-0500',
+                'resourceURI': 'http://gateway.marvel.com/v1/public/%s/%s' % (resource, _id),
+                'comics': {'available': 1, 'returned': 1,
+                           'collectionURI': 'http://gateway.marvel.com/v1/public/%s/%s/comics' % (resource, _id),
+                           'items': [{'resourceURI': 'http://gateway.marvel.com/v1/public/comics/%s' % (_id + 1),
+                                      'name': 'Item %s' % (_id + 1)}]}}
+
+    def page(self, resource, offset, limit, total):
+        results = [self.item(resource, i) for i in range(offset, min(offset + limit, total))]
+        return {'code': 200, 'status': 'Ok', 'etag': '%s-%s' % (resource, offset),
+                'data': {'offset': offset, 'limit': limit, 'total': total,
+                         'count': len(results), 'results': results}}
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        params = params or {}
+        self.calls.append((url, dict(params), dict(headers or {})))
+        time.sleep(self.delay)
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        resource = url.split('/public/', 1)[1].split('/')
+        if len(resource) == 2 and int(resource[1]) in self.missing:
+            body = {'code': 404, 'status': "We couldn't find that %s" % resource[0]}
+        elif len(resource) == 2:
+            body = self.page(resource[0], 0, 20, 1)
+            body['data']['results'] = [self.item(resource[0], int(resource[1]))]
+        else:
+            body = self.page(resource[0], int(params.get('offset', 0)),
+                             int(params.get('limit', 20)), self.total)
+        if 'etag' in body and (headers or {}).get('If-None-Match') == body['etag']:
+            return FakeResponse(None, 304)
+        return FakeResponse(body, body['code'])
+
+    def close(self):
+        self.closed = True
+
+
+class ModifiedTransport(FakeTransport):
+
+    """
+    Serves list calls with modifiedSince and orderBy=modified over resources
+    modified on distinct days, and can modify one after the first page.
+    """
+
+    def __init__(self, total):
+        super(ModifiedTransport, self).__init__(total)
+        self.modified = dict((i, '2014-01-%02dT10:00:00-0500' % (i + 1)) for i in range(total))
+        self.edit = None
+
+    def item(self, resource, _id):
+        item = super(ModifiedTransport, self).item(resource, _id)
+        item['modified'] = self.modified[_id]
+        return item
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if 'modifiedSince' not in (params or {}):
+            return super(ModifiedTransport, self).get(url, params, headers, timeout)
+        self.calls.append((url, dict(params), dict(headers or {})))
+        since = sortable_datetime(params['modifiedSince'])
+        ids = sorted((i for i in self.modified if sortable_datetime(self.modified[i]) >= since),
+                     key=lambda i: (sortable_datetime(self.modified[i]), i))
+        offset, limit = int(params['offset']), int(params['limit'])
+        results = [self.item('characters', i) for i in ids[offset:offset + limit]]
+        if self.edit is not None:
+            self.modified[self.edit] = '2015-02-01T10:00:00-0500'
+            self.edit = None
+        return FakeResponse({'code': 200, 'status': 'Ok', 'data': {
+            'offset': offset, 'limit': limit, 'total': len(ids), 'count': len(results), 'results': results}})
+
+
+class TransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport)
+
+    def test_calls_share_transport(self):
+        cdw = self.m.get_characters(limit=20)
+        assert cdw.data.count == 20
+        assert cdw.next().data.offset == 20
+        assert self.m.get_character(1009718).data.result.id == 1009718
+        assert len(self.transport.calls) == 3
+
+    def test_auth_params(self):
+        self.m.get_comics()
+        params = self.transport.calls[0][1]
+        assert params['apikey'] == PUBLIC_KEY
+        assert len(params['hash']) == 32
+
+    def test_fetch_all(self):
+        cdw = self.m.get_characters(limit=20)
+        characters = cdw.fetch_all(workers=3)
+        assert [c.id for c in characters] == list(range(95))
+        assert len(self.transport.calls) == 5
+        assert cdw.next().fetch_all()[0].id == 20
+
+    def test_fetch_all_error_first_page(self):
+        self.transport.failures = [FakeResponse({'code': 409, 'status': 'Limit greater than 100.'}, 409)]
+        cdw = self.m.get_characters(limit=500)
+        self.assertRaises(ApiError, cdw.fetch_all)
+
+    def test_fetch_all_single_page(self):
+        assert [c.id for c in self.m.get_comics(limit=100).fetch_all()] == list(range(95))
+        assert len(self.m.get_comic(3).fetch_all()) == 1
+        assert len(self.transport.calls) == 2
+
+    def test_iter_results(self):
+        characters = self.m.iter_results(self.m.get_characters, prefetch=2, limit=20)
+        assert [c.id for c in characters] == list(range(95))
+        assert len(self.transport.calls) == 5
+
+    def test_iter_results_error_first_page(self):
+        self.transport.failures = [FakeResponse({'code': 409, 'status': 'Limit greater than 100.'}, 409)]
+        results = self.m.get_characters(limit=500).iter_results()
+        self.assertRaises(ApiError, next, results)
+
+    def test_iter_results_stops_prefetching(self):
+        for character in self.m.get_characters(limit=10).iter_results(prefetch=3):
+            break
+        assert len(self.transport.calls) <= 4
+
+    def test_structures_are_memoized(self):
+        cdw = self.m.get_characters(limit=20)
+        assert cdw.data is cdw.data
+        assert cdw.data.results is cdw.data.results
+        assert cdw.data.result is cdw.data.results[0]
+        assert cdw.data.result.comics is cdw.data.result.comics
+        assert cdw.data.result.comics.items is cdw.data.result.comics.items
+
+    def test_model_objects_have_no_dict(self):
+        cdw = self.m.get_characters(limit=1)
+        for obj in (cdw, cdw.data, cdw.data.result, cdw.data.result.comics,
+                    cdw.data.result.comics.items[0]):
+            assert not hasattr(obj, '__dict__')
+        assert cdw.data.result.params == {}
+
+    def test_parse_datetime(self):
+        date = parse_datetime('2013-11-20T17:40:18-0500')
+        assert date.replace(tzinfo=None) == datetime(2013, 11, 20, 17, 40, 18)
+        assert date.utcoffset() == timedelta(hours=-5)
+        assert parse_datetime('2013-11-20T22:40:18+00:00') == date
+        # Event start and end dates have no offset and are taken as UTC
+        assert parse_datetime('2013-11-20 22:40:18') == date
+        self.assertRaises(ValueError, parse_datetime, '-0001-11-30T00:00:00-0500')
+
+    def test_parse_datetimes_caches_on_results(self):
+        container = self.m.get_characters(limit=20).data
+        results = container.parse_datetimes()
+        assert results[0].modified is results[19].modified
+        assert results[0].modified == parse_datetime('2014-01-15T19:43:09-0500')
+
+    def test_get_by_ids(self):
+        self.transport.missing = (7,)
+        found = self.m.get_comics_by_ids([3, 5, 3, '5', 7], workers=2)
+        assert sorted(found) == [3, 5]
+        assert found[3].id == 3
+        assert found.missing == [7]
+        assert len(self.transport.calls) == 3
+
+    def test_get_by_ids_defaults_to_max_workers(self):
+        workers = []
+        run = self.m.map
+        self.m.map = lambda fn, ids, limit: workers.append(limit) or run(fn, ids, limit)
+        assert sorted(self.m.get_comics_by_ids([1, 2, 3])) == [1, 2, 3]
+        # None is resolved to max_workers by map()
+        assert workers == [None]
+
+    def test_context_manager_closes_transport(self):
+        with self.m as m:
+            m.get_comics()
+        assert self.transport.closed
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, cache=ResponseCache())
+
+    def test_cache_key(self):
+        assert cache_key('comics', {'limit': 10, 'hash': 'x', 'ts': 1, 'apikey': 'y'}) == 'comics?limit=10'
+        assert cache_key('comics', {'b': True, 'a': '1'}) == cache_key('comics', {'a': 1, 'b': 'true'})
+        assert cache_key('comics', {'orderBy': ['name', '-modified']}) == 'comics?orderBy=name%2C-modified'
+        assert cache_key('comics', {'orderBy': ['-modified', 'name']}) == 'comics?orderBy=-modified%2Cname'
+        assert cache_key('comics', {'characters': set([2, 1])}) == cache_key('comics', {'characters': '1,2'})
+
+    def test_revalidates_with_etag(self):
+        first = self.m.get_comics(limit=10)
+        second = self.m.get_comics(limit=10)
+        assert 'If-None-Match' not in self.transport.calls[0][2]
+        assert self.transport.calls[1][2]['If-None-Match'] == first.etag
+        assert second.to_dict() == first.to_dict()
+        assert len(self.transport.calls) == 2
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        cache.set('a', {}, 'a')
+        cache.set('b', {}, 'b')
+        cache.get('a')
+        cache.set('c', {}, 'c')
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+    def test_fresh_entries_skip_network(self):
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport,
+                   cache=ResponseCache(ttl={'stories': 3600}))
+        m.get_stories(limit=5)
+        m.get_stories(limit=5)
+        m.get_comics(limit=5)
+        m.get_comics(limit=5)
+        assert [c[0].rsplit('/', 1)[1] for c in self.transport.calls] == ['stories', 'comics', 'comics']
+
+
+class SQLiteCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_survives_restart(self):
+        transport = FakeTransport()
+        cache = SQLiteCache(self.path, default_ttl=3600)
+        Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=transport, cache=cache).get_comics(limit=5)
+        cache.close()
+
+        cache = SQLiteCache(self.path, default_ttl=3600)
+        cdw = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=transport, cache=cache).get_comics(limit=5)
+        assert cdw.data.count == 5
+        assert len(transport.calls) == 1
+        cache.close()
+
+    def test_size_bounded_eviction(self):
+        cache = SQLiteCache(self.path, max_bytes=250)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'data': 'x' * 100}, key)
+        assert 'a' not in cache
+        assert 'b' in cache and 'c' in cache
+        cache.close()
+
+
+class RateLimitTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_token_bucket_raises_when_not_blocking(self):
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeTransport(),
+                   rate_limiter=TokenBucket(rate=0.01, capacity=2, block=False))
+        m.get_comics()
+        m.get_comics(offset=20)
+        self.assertRaises(RateLimitExceeded, m.get_comics, offset=40)
+
+    def test_token_bucket_waits(self):
+        bucket = TokenBucket(rate=1000, capacity=1)
+        assert bucket.reserve() == 0
+        assert 0 < bucket.reserve() <= 0.001
+
+    def test_daily_budget_is_shared_through_file(self):
+        path = os.path.join(self.tmp, 'budget.json')
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeTransport(),
+                   budget=DailyBudget(limit=3, path=path))
+        m.get_comics()
+        m.get_comics(offset=20)
+        other = DailyBudget(limit=3, path=path)
+        assert other.used == 2
+        assert m.quota_remaining == 1
+        other.consume()
+        self.assertRaises(QuotaExceeded, m.get_comics, offset=40)
+
+
+class RetryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.retried = []
+        self.retry = RetryPolicy(max_attempts=3, backoff=0.001,
+                                 on_retry=lambda *args: self.retried.append(args))
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, retry=self.retry)
+
+    def test_retries_transient_failures(self):
+        truncated = FakeResponse(None)
+        truncated.content = b'{"code": 200, "da'
+        self.transport.failures = [IOError('connection reset'), truncated]
+        cdw = self.m.get_comics()
+        assert cdw.code == 200
+        assert len(self.transport.calls) == 3
+        assert self.retry.retries == 2
+        assert [r[1] for r in self.retried] == [1, 2]
+
+    def test_respects_retry_after(self):
+        self.transport.failures = [FakeResponse({'code': 429, 'status': 'Slow down'}, 429, {'Retry-After': '0'})]
+        assert self.m.get_comics().code == 200
+        assert self.retried[0][2:] == (0.0, 429)
+
+    def test_gives_up_after_max_attempts(self):
+        error = FakeResponse({'code': 503, 'status': 'Unavailable'}, 503)
+        self.transport.failures = [error, error, error]
+        assert self.m.get_comics().code == 503
+        assert len(self.transport.calls) == 3
+
+    def test_other_errors_are_not_retried(self):
+        self.transport.failures = [KeyError('x')]
+        self.assertRaises(KeyError, self.m.get_comics)
+        assert len(self.transport.calls) == 1
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def fetch_concurrently(self, m, count=5):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(m.get_character(1009718)))
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_calls_share_a_request(self):
+        transport = FakeTransport()
+        transport.delay = 0.05
+        results = self.fetch_concurrently(Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=transport))
+        assert len(results) == 5
+        assert all(r.data.result.id == 1009718 for r in results)
+        assert len(transport.calls) == 1
+
+    def test_can_be_disabled(self):
+        transport = FakeTransport()
+        transport.delay = 0.05
+        self.fetch_concurrently(Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=transport, single_flight=False))
+        assert len(transport.calls) == 5
+
+
+class ExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.transport.delay = 0.01
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, max_workers=4)
+
+    def tearDown(self):
+        self.m.close()
+
+    def test_map(self):
+        comics = self.m.map(self.m.get_comic, range(10), workers=3)
+        assert [c.data.result.id for c in comics] == list(range(10))
+
+    def test_submit(self):
+        future = self.m.submit(self.m.get_character, 1009718)
+        assert future.result().data.result.id == 1009718
+
+    def test_nested_calls_do_not_deadlock(self):
+        pages = self.m.map(lambda offset: self.m.get_comics(offset=offset).fetch_all(workers=4),
+                           [0, 20, 40, 60, 80])
+        assert [len(p) for p in pages] == [95, 75, 55, 35, 15]
+
+    def test_close_shuts_down_pool(self):
+        self.m.submit(self.m.get_comics).result()
+        executor = self.m.executor
+        self.m.close()
+        self.assertRaises(RuntimeError, executor.submit, self.m.get_comics)
+
+
+class CrawlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(total=10)
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport)
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.m.close()
+        shutil.rmtree(self.tmp)
+
+    def test_crawl_dedupes_across_types(self):
+        seen = []
+        crawler = Crawler(self.m, relations=('characters', 'comics'), max_depth=2, on_item=seen.append)
+        items = crawler.crawl([('events', 1)])
+        assert len(items) == 21
+        assert len(seen) == 21
+        assert items[('characters', 3)].id == 3
+        assert items[('events', 1)].id == 1
+        # events/1 + 2 related lists + 10 comics -> characters + 10 characters -> comics
+        assert len(self.transport.calls) == 23
+
+    def test_crawl_resumes_from_checkpoint(self):
+        path = os.path.join(self.tmp, 'crawl.json')
+
+        def interrupt(item):
+            if item.resource_url() == 'characters' and item.id != 1:
+                raise KeyboardInterrupt
+
+        crawler = Crawler(self.m, relations=('comics', 'characters'), max_depth=2, checkpoint=path,
+                          on_item=interrupt)
+        self.assertRaises(KeyboardInterrupt, crawler.crawl, [('characters', 1)])
+        assert os.path.exists(path)
+        calls = len(self.transport.calls)
+        crawler.on_item = None
+        items = crawler.crawl([('characters', 1)])
+        # Resumed after depth 1: only the characters of the 10 comics are fetched
+        assert sorted(items) == [('characters', i) for i in range(10) if i != 1]
+        assert len(self.transport.calls) == calls + 10
+        assert not os.path.exists(path)
+
+    def test_finished_crawl_removes_checkpoint(self):
+        path = os.path.join(self.tmp, 'crawl.json')
+        Crawler(self.m, relations=('comics',), max_depth=1, checkpoint=path).crawl([('characters', 1)])
+        assert not os.path.exists(path)
+        items = Crawler(self.m, relations=('comics',), max_depth=1, checkpoint=path).crawl([('characters', 2)])
+        assert ('characters', 2) in items and len(items) == 11
+
+
+class IdentityMapTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(total=10)
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport,
+                        identity_map=IdentityMap(maxsize=100))
+
+    def tearDown(self):
+        self.m.close()
+
+    def test_same_instance_across_calls(self):
+        page = self.m.get_characters(limit=5).data.results
+        single = self.m.get_character(3).data.result
+        assert single is page[3]
+        summary = self.m.get_characters().data.results[2].comics.items[0]
+        assert summary.get().data.result is self.m.get_comic(3).data.result
+
+    def test_newer_data_is_merged(self):
+        character = self.m.get_character(3).data.result
+        assert character.name == 'Item 3'
+        newer = self.transport.page('characters', 0, 20, 1)
+        newer['data']['results'] = [dict(self.transport.item('characters', 3), name='Renamed',
+                                         modified='2015-01-15T19:43:09-0500')]
+        self.transport.failures.append(FakeResponse(newer))
+        assert self.m.get_character(3).data.result is character
+        assert character.name == 'Renamed'
+        assert character.modified.year == 2015
+
+    def test_bounded(self):
+        identity_map = IdentityMap(maxsize=3)
+        self.m.identity_map = identity_map
+        self.m.get_characters(limit=5).data.results
+        assert len(identity_map) == 3
+        assert ('characters', 4) in identity_map
+        assert ('characters', 0) not in identity_map
+
+        weak = IdentityMap(weak=True)
+        self.m.identity_map = weak
+        wrapper = self.m.get_characters(limit=5)
+        results = wrapper.data.results
+        assert len(weak) == 5
+        del wrapper, results
+        assert len(weak) == 0
+
+    def test_batch_skips_known_ids(self):
+        self.m.get_characters(limit=5).data.results
+        calls = len(self.transport.calls)
+        result = self.m.get_characters_by_ids([1, 2, 7])
+        assert sorted(result) == [1, 2, 7]
+        assert len(self.transport.calls) == calls + 1
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(total=250)
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport)
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.m.close()
+        shutil.rmtree(self.tmp)
+
+    def test_export_sqlite(self):
+        store = SQLiteStore(os.path.join(self.tmp, 'mirror.db'))
+        counts = Exporter(self.m, store, resources=('characters', 'comics'), workers=2).export()
+        assert counts == {'characters': 250, 'comics': 250}
+        assert store.count('comics') == 250
+        assert store.checkpoint('comics') is None
+        store.close()
+
+    def test_export_resumes(self):
+        store = JSONLStore(self.tmp)
+        exporter = Exporter(self.m, store, resources=('characters',), workers=1)
+        self.transport.failures = [FakeResponse(self.transport.page('characters', 0, 100, 250)),
+                                   FakeResponse(self.transport.page('characters', 100, 100, 250)),
+                                   FakeResponse({'code': 500, 'status': 'Internal Server Error'})]
+        self.assertRaises(ApiError, exporter.export)
+        assert store.checkpoint('characters')['offset'] == 200
+        # A partial page written after the checkpoint is dropped on resume
+        with open(store.path('characters'), 'a') as f:
+            f.write('{"id": 200}\n')
+
+        calls = len(self.transport.calls)
+        assert exporter.export() == {'characters': 50}
+        assert len(self.transport.calls) == calls + 1
+        with open(store.path('characters')) as f:
+            ids = [json.loads(line)['id'] for line in f]
+        assert ids == list(range(250))
+
+    def test_export_resource_twice(self):
+        for store in (JSONLStore(self.tmp), SQLiteStore(os.path.join(self.tmp, 'mirror.db'))):
+            exporter = Exporter(self.m, store, resources=('comics',), workers=2)
+            assert exporter.export_resource('comics') == 250
+            assert store.checkpoint('comics') is None
+            assert exporter.export_resource('comics') == 250
+
+    def test_export_skips_finished_collections(self):
+        store = SQLiteStore(os.path.join(self.tmp, 'mirror.db'))
+        exporter = Exporter(self.m, store, resources=('characters', 'comics'), workers=1)
+        self.transport.failures = [FakeResponse(self.transport.page('characters', offset, 100, 250))
+                                   for offset in (0, 100, 200)]
+        self.transport.failures.append(FakeResponse({'code': 500, 'status': 'Internal Server Error'}))
+        self.assertRaises(ApiError, exporter.export)
+        assert store.checkpoint('characters') is None
+
+        calls = len(self.transport.calls)
+        assert exporter.export() == {'characters': 0, 'comics': 250}
+        assert [call[0].rsplit('/', 1)[1] for call in self.transport.calls[calls:]] == ['comics'] * 3
+        assert store.checkpoint('export') is None
+        assert exporter.export() == {'characters': 250, 'comics': 250}
+        store.close()
+
+    def test_sync_since_high_water(self):
+        store = SQLiteStore(os.path.join(self.tmp, 'mirror.db'))
+        exporter = Exporter(self.m, store, resources=('characters',), workers=2)
+        exporter.sync()
+        assert store.count('characters') == 250
+        assert store.high_water('characters') == '2014-01-15T19:43:09-0500'
+
+        changed = self.transport.page('characters', 0, 100, 3)
+        for item in changed['data']['results']:
+            item['modified'] = '2015-02-0%sT10:00:00-0500' % (item['id'] + 1)
+        self.transport.failures.append(FakeResponse(changed))
+        assert exporter.sync() == {'characters': 3}
+        params = self.transport.calls[-1][1]
+        assert params['modifiedSince'] == '2014-01-15T19:43:09-0500'
+        assert params['orderBy'] == 'modified'
+        assert store.count('characters') == 250
+        assert store.high_water('characters') == '2015-02-03T10:00:00-0500'
+        store.close()
+
+    def test_sync_after_export_resource(self):
+        for store in (JSONLStore(self.tmp), SQLiteStore(os.path.join(self.tmp, 'mirror.db'))):
+            exporter = Exporter(self.m, store, resources=('characters',), workers=2)
+            assert exporter.export_resource('characters') == 250
+            changed = self.transport.page('characters', 0, 100, 2)
+            for item in changed['data']['results']:
+                item['modified'] = '2015-02-01T10:00:00-0500'
+            self.transport.failures.append(FakeResponse(changed))
+            assert exporter.sync_resource('characters') == 2
+            assert self.transport.calls[-1][1]['modifiedSince'] == '2014-01-15T19:43:09-0500'
+            assert store.checkpoint('characters') is None
+            assert store.high_water('characters') == '2015-02-01T10:00:00-0500'
+
+    def test_sync_while_resources_are_modified(self):
+        transport = ModifiedTransport(10)
+        store = SQLiteStore(os.path.join(self.tmp, 'sync.db'))
+        store.set_high_water('characters', '2014-01-01T10:00:00-0500')
+        # Resource 1 moves to the end of the list once the first page is read
+        transport.edit = 1
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=transport) as m:
+            exporter = Exporter(m, store, resources=('characters',), page_size=3)
+            assert exporter.sync() == {'characters': 11}
+        rows = store.query("SELECT id, modified FROM resources ORDER BY id")
+        assert [row[0] for row in rows] == list(range(10))
+        assert rows[1][1] == '2015-02-01T15:00:00'
+        assert store.high_water('characters') == '2015-02-01T10:00:00-0500'
+        assert [call[1]['modifiedSince'][:10] for call in transport.calls[:3]] == [
+            '2014-01-01', '2014-01-03', '2014-01-06']
+        store.close()
+
+
+class OfflineMarvelTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.store = SQLiteStore(os.path.join(cls.tmp, 'mirror.db'))
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeTransport(total=30)) as m:
+            Exporter(m, cls.store, resources=('characters', 'comics')).export()
+            comic = dict(FakeTransport().item('comics', 100), issueNumber=1.0, startYear=2014, characters={
+                'items': [{'resourceURI': 'http://gateway.marvel.com/v1/public/characters/%s' % _id}
+                          for _id in (4, 6)]})
+            cls.store.write('comics', [Comic(m, comic)])
+        cls.m = OfflineMarvel(cls.store)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.close()
+        shutil.rmtree(cls.tmp)
+
+    def test_filters_and_order(self):
+        cdw = self.m.get_characters(nameStartsWith='item 1', orderBy='-name', limit=5)
+        assert isinstance(cdw, CharacterDataWrapper)
+        assert cdw.data.total == 11
+        assert [c.name for c in cdw.data.results] == ['Item 19', 'Item 18', 'Item 17', 'Item 16', 'Item 15']
+        assert cdw.next().data.results[0].name == 'Item 14'
+
+        modified = self.m.get_characters(modifiedSince='2014-01-17', limit=5)
+        assert modified.data.total == 0
+        assert self.m.get_characters(modifiedSince='2014-01-15', limit=5).data.total == 30
+
+    def test_related_filter(self):
+        comics = self.m.get_comics(characters=4)
+        assert [c.id for c in comics.data.results] == [5, 100]
+        # Related to every id, not to any of them
+        assert [c.id for c in self.m.get_comics(characters='4,6').data.results] == [100]
+        assert [c.id for c in self.m.get_comics(characters=[4, 6, 4]).data.results] == [100]
+        assert self.m.get_comics(characters='4,5').data.total == 0
+
+    def test_numeric_fields(self):
+        assert [c.id for c in self.m.get_comics(issueNumber=1).data.results] == [100]
+        assert [c.id for c in self.m.get_comics(issueNumber='1.0').data.results] == [100]
+        assert [c.id for c in self.m.get_comics(startYear='2014').data.results] == [100]
+        assert self.m.get_comics(issueNumber=2).data.total == 0
+        assert self.m.get_comics(issueNumber='one').code == 409
+
+    def test_single_and_errors(self):
+        assert self.m.get_character(3).data.result.name == 'Item 3'
+        assert self.m.get_character(300).code == 404
+        assert self.m.get_characters(dateRange='2013-01-01,2013-01-02').code == 409
+        assert self.m.get_characters(limit=500).code == 409
+
+
+class ColumnsTestCase(unittest.TestCase):
+
+    results = [
+        {'id': 1, 'issueNumber': 1, 'pageCount': 32, 'modified': '2014-01-15T19:43:09-0500',
+         'prices': [{'type': 'printPrice', 'price': 2.99}], 'series': {'name': 'X-Men'}},
+        {'id': 2, 'issueNumber': 2.5, 'modified': '-0001-11-30T00:00:00-0500',
+         'prices': [{'type': 'digitalPurchasePrice', 'price': 1.99}], 'series': {'name': 'Hulk'}},
+    ]
+
+    def test_array_backend(self):
+        columns = to_columns(self.results, ['id', 'issueNumber', 'pageCount', 'modified',
+                                            'prices.printPrice', 'series.name'], backend='array')
+        assert list(columns) == ['id', 'issueNumber', 'pageCount', 'modified', 'prices.printPrice', 'series.name']
+        assert columns['id'].typecode == INT_TYPECODE and list(columns['id']) == [1, 2]
+        assert list(columns['issueNumber']) == [1.0, 2.5]
+        assert columns['pageCount'][0] == 32 and columns['pageCount'][1] != columns['pageCount'][1]
+        assert columns['modified'][0] == 1389832989  # 2014-01-16T00:43:09 UTC
+        assert columns['modified'][1] != columns['modified'][1]
+        assert columns['prices.printPrice'][0] == 2.99
+        assert columns['series.name'] == ['X-Men', 'Hulk']
+
+    def test_event_dates(self):
+        events = [{'id': 1, 'start': '2014-01-16 00:43:09', 'end': '2014-01-15T19:43:09-0500'},
+                  {'id': 2, 'start': None, 'end': '-0001-11-30 00:00:00'}]
+        backends = ['array'] + [name for name, module in (('numpy', numpy), ('arrow', pyarrow)) if module]
+        for backend in backends:
+            columns = to_columns(events, ['start', 'end'], backend=backend)
+            starts, ends = list(columns['start']), list(columns['end'])
+            if backend == 'array':
+                assert starts[0] == ends[0] == 1389832989
+                assert starts[1] != starts[1] and ends[1] != ends[1]
+            elif backend == 'numpy':
+                assert starts[0] == ends[0] == numpy.datetime64('2014-01-16T00:43:09')
+                assert numpy.isnat(starts[1]) and numpy.isnat(ends[1])
+            else:
+                starts, ends = columns['start'].to_pylist(), columns['end'].to_pylist()
+                assert starts[0] == ends[0] and starts[0].year == 2014
+                assert starts[1] is None and ends[1] is None
+
+    def test_fetch_columns(self):
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeTransport(total=250))
+        wrapper = m.get_comics(limit=100)
+        columns = wrapper.data.to_columns({'id': 'int', 'title': 'str'}, backend='array')
+        assert len(columns['id']) == 100
+        columns = wrapper.fetch_columns(['id', 'title'], backend='array')
+        assert list(columns['id']) == list(range(250))
+        assert columns['title'][249] == 'Item 249'
+        m.close()
+
+
+class DecoderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_get_decoder(self):
+        assert get_decoder('json') is json_loads
+        assert get_decoder(json.loads) is json.loads
+        assert get_decoder()(b'{"code": 200}') == {'code': 200}
+        self.assertRaises(ImportError, get_decoder, 'simplejson')
+
+    def test_decoder_option(self):
+        decoded = []
+
+        def loads(content):
+            decoded.append(content)
+            return json_loads(content)
+
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, decoder=loads)
+        assert m.get_comics().data.count == 20
+        assert len(decoded) == 1
+
+    def test_raw(self):
+        cache = SQLiteCache(os.path.join(self.tmp, 'cache.db'))
+        m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, cache=cache)
+        content = m.get_raw('comics', limit=5)
+        assert json.loads(content.decode('utf-8'))['data']['count'] == 5
+        assert len(cache) == 0
+        self.transport.missing = (7,)
+        self.assertRaises(ApiError, m.get_raw, 'comics/7')
+
+        # Decoded calls store the raw body in the cache
+        m.get_comics(limit=5)
+        assert bytes(cache._db.execute("SELECT body FROM responses").fetchone()[0]) == content
+        assert cache.get(cache_key('comics', {'limit': 5})).body['data']['count'] == 5
+        cache.close()
+
+
+class ImportTestCase(unittest.TestCase):
+
+    def modules_after(self, code):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = "import sys; %s; print(','.join(sorted(sys.modules)))" % code
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=root)
+        return output.decode('utf-8').strip().split(',')
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'lazy package attributes need Python 3.7')
+    def test_import_is_lazy(self):
+        modules = self.modules_after('import marvel')
+        for name in ('requests', 'marvel.marvel', 'marvel.comic', 'sqlite3'):
+            assert name not in modules, name
+
+        modules = self.modules_after("from marvel import Marvel; Marvel('public', 'private')")
+        assert 'marvel.marvel' in modules
+        for name in ('requests', 'marvel.comic', 'concurrent.futures', 'sqlite3'):
+            assert name not in modules, name
+
+
+class StandInTestCase(unittest.TestCase):
+
+    def setUp(self):
+        data = SyntheticData(totals={'comics': 250, 'characters': 30, 'series': 10, 'events': 5}, related=2)
+        self.server = StandInServer(data).start()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_synthetic_paging(self):
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=self.server.endpoint, cache=ResponseCache()) as m:
+            comics = m.get_comics(limit=100).fetch_all(workers=4)
+            assert [c.id for c in comics] == list(range(1, 251))
+            comic = m.get_comic(7).data.result
+            assert comic.title == 'Comic 7'
+            assert comic.prices[0].price == 3.99
+            assert len(comic.characters.items) == 2
+            assert m.get_comic(251).code == 404
+            assert m.get_comics(limit=500).code == 409
+            # Revalidated with the etag and served from the cache
+            assert m.get_comic(7).data.result.title == 'Comic 7'
+
+    def test_event_datetimes(self):
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=self.server.endpoint) as m:
+            events = m.get_events(limit=5).data.parse_datetimes()
+            assert len(events) == 5
+            assert events[0].start == datetime(2010, 1, 1, tzinfo=FixedOffset(0))
+            assert events[0].end.year == 2011
+            assert m.get_event(2).data.result.start == events[0].start
+
+    def test_record_and_replay(self):
+        fixtures = os.path.join(self.tmp, 'fixtures')
+        recording = RecordingTransport(fixtures)
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=self.server.endpoint, transport=recording) as m:
+            recorded = [c.id for c in m.get_characters(limit=10, offset=5).data.results]
+        self.server.stop()
+
+        with Marvel('other', 'keys', transport=ReplayTransport(fixtures)) as m:
+            assert [c.id for c in m.get_characters(offset=5, limit=10).data.results] == recorded
+            assert m.get_characters(limit=11).code == 404
+
+        with StandInServer(fixtures=fixtures) as server:
+            with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=server.endpoint) as m:
+                assert [c.id for c in m.get_characters(limit=10, offset=5).data.results] == recorded
+
+    def test_replay_bool_and_list_params(self):
+        fixtures = os.path.join(self.tmp, 'fixtures')
+        params = {'hasDigitalIssue': True, 'orderBy': ['title', '-modified'], 'limit': 5}
+        with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=self.server.endpoint,
+                    transport=RecordingTransport(fixtures)) as m:
+            recorded = [c.id for c in m.get_comics(**params).data.results]
+        self.server.stop()
+
+        with StandInServer(fixtures=fixtures) as server:
+            with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=server.endpoint) as m:
+                assert [c.id for c in m.get_comics(**params).data.results] == recorded
+                assert m.get_comics(hasDigitalIssue=False, orderBy=['title', '-modified'], limit=5).code == 404
+                assert m.get_comics(hasDigitalIssue=True, orderBy=['-modified', 'title'], limit=5).code == 404
+                assert m.get_comics().code == 404
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self.events = []
+        self.metrics = MetricsCollector(buckets=(0.1, 1.0))
+        self.m = Marvel(PUBLIC_KEY, PRIVATE_KEY, transport=self.transport, cache=ResponseCache(),
+                        on_call=[self.events.append, self.metrics])
+
+    def test_call_events(self):
+        self.m.get_characters(limit=10, orderBy=['name', '-modified'])
+        self.m.get_character(12)
+        event = self.events[0]
+        assert event.resource == 'characters'
+        assert event.params == {'limit': '10', 'orderBy': 'name,-modified'}
+        assert (event.status_code, event.code, event.cache, event.retries) == (200, 200, 'miss', 0)
+        assert event.size > 0
+        assert event.total >= 0 and not event.coalesced
+        assert self.events[1].resource == 'characters/{id}'
+
+    def test_cache_outcomes_and_retries(self):
+        self.m.cache.default_ttl = 60
+        self.m.get_comic(1)
+        self.m.get_comic(1)
+        self.m.cache.default_ttl = 0
+        self.m.get_comic(1)
+        assert [e.cache for e in self.events] == ['miss', 'hit', 'revalidated']
+        assert [e.status_code for e in self.events] == [200, None, 304]
+        assert self.events[1].size is None and self.events[2].size == 0
+
+        self.m.retry = RetryPolicy(backoff=0.001)
+        self.transport.failures = [IOError('connection reset')]
+        self.m.get_comics()
+        assert self.events[-1].retries == 1
+        assert self.metrics.retries.get('comics') == 1
+
+    def test_errors(self):
+        self.transport.failures = [KeyError('x')]
+        self.assertRaises(KeyError, self.m.get_comics)
+        assert self.events[-1].error.__class__ is KeyError
+        assert self.metrics.errors.get('comics', 'KeyError') == 1
+
+        self.transport.missing = (3,)
+        self.assertRaises(ApiError, self.m.get_raw, 'comics/3')
+        assert (self.events[-1].status_code, self.events[-1].code) == (404, 404)
+
+    def test_failing_callback(self):
+        def fail(event):
+            raise ValueError('callback')
+        self.m.on_call.insert(0, fail)
+        logger = logging.getLogger('marvel.marvel')
+        logger.disabled = True
+        try:
+            assert self.m.get_comic(1).data.result.id == 1
+            self.transport.failures = [KeyError('x')]
+            self.assertRaises(KeyError, self.m.get_comics)
+        finally:
+            logger.disabled = False
+        assert [e.error.__class__ for e in self.events] == [type(None), KeyError]
+
+    def test_coalesced_calls(self):
+        self.transport.delay = 0.05
+        threads = [threading.Thread(target=self.m.get_comic, args=(5,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(self.transport.calls) == 1
+        assert sorted(e.coalesced for e in self.events) == [False, True]
+        assert [e.status_code for e in self.events] == [200, 200]
+        assert self.events[0].size == self.events[1].size > 0
+
+    def test_histogram(self):
+        histogram = MetricsCollector(buckets=(0.1, 0.2, 0.4)).latency
+        for value in (0.05, 0.15, 0.15, 0.3, 5):
+            histogram.observe(value, ('comics',))
+        assert histogram.count('comics') == 5
+        assert abs(histogram.sum('comics') - 5.65) < 1e-9
+        assert abs(histogram.percentile(0.5, 'comics') - 0.175) < 1e-9
+        assert histogram.percentile(0.99, 'comics') == 0.4
+        assert histogram.percentile(0.5, 'series') is None
+
+    def test_prometheus_text(self):
+        self.m.get_comics()
+        self.m.get_comics(offset=20)
+        text = self.metrics.to_prometheus()
+        assert '# TYPE marvel_calls_total counter' in text
+        assert 'marvel_calls_total{cache="miss",code="200",resource="comics",status="200"} 2' in text
+        assert 'marvel_call_duration_seconds_bucket{le="+Inf",resource="comics"} 2' in text
+        assert 'marvel_call_duration_seconds_count{resource="comics"} 2' in text
+        assert '# TYPE marvel_call_ttfb_seconds histogram' in text
+
+    def test_ttfb_over_http(self):
+        metrics = MetricsCollector()
+        with StandInServer(SyntheticData(totals={'comics': 30})) as server:
+            with Marvel(PUBLIC_KEY, PRIVATE_KEY, endpoint=server.endpoint, on_call=metrics) as m:
+                m.get_comics(limit=10)
+        assert metrics.ttfb.count('comics') == 1
+        assert 0 < metrics.ttfb.sum('comics') <= metrics.latency.sum('comics')
+        assert metrics.bytes.get('comics') > 0
+
+
+class FakeAsyncTransport(FakeTransport):
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(super(FakeAsyncTransport, self).get(url, params, headers, timeout))
+        return future
+
+
+@unittest.skipIf(AsyncMarvel is None, "AsyncMarvel requires Python 3")
+class AsyncMarvelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.m = AsyncMarvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeAsyncTransport())
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def test_get_methods_are_awaitable(self):
+        cdw = self.run_async(self.m.get_characters(limit=20))
+        assert type(cdw) is CharacterDataWrapper
+        assert cdw.data.count == 20
+        comics = self.run_async(asyncio.gather(*[self.m.get_comic(i) for i in (1, 2, 3)]))
+        assert [c.data.result.id for c in comics] == [1, 2, 3]
+
+    def test_pagination_and_related_are_awaitable(self):
+        cdw = self.run_async(self.m.get_characters(limit=20))
+        assert self.run_async(cdw.next()).data.offset == 20
+        assert self.run_async(cdw.previous()) is None
+        assert type(self.run_async(cdw.data.result.get_comics())) is ComicDataWrapper
+
+    def test_fetch_all(self):
+        cdw = self.run_async(self.m.get_characters(limit=20))
+        characters = self.run_async(cdw.fetch_all(workers=2))
+        assert [c.id for c in characters] == list(range(95))
+
+    def test_fetch_all_error_first_page(self):
+        self.m.transport.failures = [FakeResponse({'code': 409, 'status': 'Limit greater than 100.'}, 409)]
+        cdw = self.run_async(self.m.get_characters(limit=500))
+        self.assertRaises(ApiError, self.run_async, cdw.fetch_all())
+
+    def test_get_by_ids(self):
+        found = self.run_async(self.m.get_characters_by_ids([1, 2, 2]))
+        assert sorted(found) == [1, 2]
+
+    def test_map(self):
+        comics = self.run_async(self.m.map(self.m.get_comic, [3, 4, 5], workers=2))
+        assert [c.data.result.id for c in comics] == [3, 4, 5]
+
+    def test_single_flight(self):
+        results = self.run_async(asyncio.gather(*[self.m.get_comic(5) for _ in range(3)]))
+        assert [r.data.result.id for r in results] == [5, 5, 5]
+        assert len(self.m.transport.calls) == 1
+
+    def test_call_events(self):
+        events = []
+        self.m.on_call.append(events.append)
+        self.run_async(asyncio.gather(*[self.m.get_comic(5) for _ in range(2)]))
+        assert [e.coalesced for e in events] == [False, True]
+        assert [(e.status_code, e.code) for e in events] == [(200, 200), (200, 200)]
+        assert events[0].size == events[1].size > 0
+
+    def test_requires_async_with(self):
+        def use():
+            with self.m:
+                pass
+        self.assertRaises(TypeError, use)
+
+    def test_disk_cache_runs_off_the_loop(self):
+        tmp = tempfile.mkdtemp()
+        cache = SQLiteCache(os.path.join(tmp, 'cache.db'))
+        threads = []
+        get = cache.get
+        cache.get = lambda key: threads.append(threading.current_thread()) or get(key)
+        m = AsyncMarvel(PUBLIC_KEY, PRIVATE_KEY, transport=FakeAsyncTransport(), cache=cache)
+        assert self.run_async(m.get_comic(5)).data.result.id == 5
+        assert self.run_async(m.get_comic(5)).data.result.id == 5
+        assert len(m.transport.calls) == 2 and 'If-None-Match' in m.transport.calls[1][2]
+        assert threads and threading.current_thread() not in threads
+        cache.close()
+        shutil.rmtree(tmp)
+
+    def test_iter_results_error_first_page(self):
+        self.m.transport.failures = [FakeResponse({'code': 409, 'status': 'Limit greater than 100.'}, 409)]
+        cdw = self.run_async(self.m.get_characters(limit=500))
+        self.assertRaises(ApiError, self.run_async, cdw.iter_results().__anext__())
+
+    def test_query_pairs(self):
+        pairs = query_pairs({'orderBy': ['name', '-modified'], 'hasDigitalIssue': True,
+                             'characters': (3, 1), 'offset': None})
+        assert pairs == [('orderBy', 'name'), ('orderBy', '-modified'), ('hasDigitalIssue', 'true'),
+                         ('characters', '3'), ('characters', '1')]
+
+    def test_iter_results(self):
+        iterator = self.m.iter_results(self.m.get_characters, prefetch=2, limit=20)
+        ids = []
+        while True:
+            try:
+                ids.append(self.run_async(iterator.__anext__()).id)
+            except StopAsyncIteration:
+                break
+        assert ids == list(range(95))
 
 
 if __name__ == '__main__':
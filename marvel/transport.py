@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+
+DEFAULT_TIMEOUT = (3.05, 27)
+
+
+class Response(object):
+
+    """
+    Minimal response returned by transports that are not backed by requests
+    """
+
+    def __init__(self, status_code, headers, content, timings=None):
+        """
+        :param status_code: HTTP status code
+        :type status_code: int
+        :param headers: Response headers
+        :type headers: dict
+        :param content: Raw response body
+        :type content: bytes
+        :param timings: Durations measured by the transport in seconds: 'dns', 'connect' and 'ttfb'
+        :type timings: dict
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.timings = timings or {}
+
+    def json(self):
+        """
+        :returns: dict -- Decoded json body
+        """
+        return json.loads(self.content.decode('utf-8'))
+
+
+class Transport(object):
+
+    """
+    Base Transport
+
+    A Transport performs the HTTP GET requests issued by Marvel._call.
+    Child classes implement get() and, if they hold resources, close().
+    """
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Performs a GET request
+
+        :param url: Absolute url of the resource
+        :type url: str
+        :param params: query params to add to the url
+        :type params: dict
+        :param headers: extra request headers
+        :type headers: dict
+        :param timeout: (connect, read) timeout in seconds, overrides the transport default
+        :type timeout: tuple
+
+        :returns:  response -- object with status_code, headers, content and json()
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases any resources held by the transport.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RequestsTransport(Transport):
+
+    """
+    Transport backed by pooled, keep-alive requests Sessions
+
+    Each thread gets its own Session, and all of them share one
+    connection pool, so the transport can be used from many threads.
+
+    >>> t = RequestsTransport(pool_maxsize=20, timeout=(2, 10))
+    >>> m = Marvel(public_key, private_key, transport=t)
+
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True,
+                 timeout=DEFAULT_TIMEOUT, session=None):
+        """
+        :param pool_connections: Number of host pools to cache
+        :type pool_connections: int
+        :param pool_maxsize: Maximum number of connections kept per host
+        :type pool_maxsize: int
+        :param keep_alive: Reuse connections between calls
+        :type keep_alive: bool
+        :param timeout: Default (connect, read) timeout in seconds
+        :type timeout: tuple
+        :param session: Optional preconfigured requests.Session, shared by all threads
+        :type session: requests.Session
+        """
+        # requests is imported here rather than with the module, which only
+        # loads when a client needs its default transport
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._requests = requests
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self._shared_session = session and self._setup(session)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _setup(self, session):
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    @property
+    def session(self):
+        """
+        The Session of the current thread.
+
+        :returns: requests.Session
+        """
+        if self._shared_session is not None:
+            return self._shared_session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._setup(self._requests.Session())
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.session.get(url, params=params, headers=headers,
+                                timeout=timeout or self.timeout)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        if self._shared_session is not None:
+            self._shared_session.close()
+        self.adapter.close()
@@ -22,8 +22,14 @@ setup(name='PyMarvel',
       author_email='garrettp@gmail.com',
       url='http://github.com/gpennington/PyMarvel',
       license='MIT',
-      packages=find_packages(),
-      install_requires=['requests'],
+      packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
+      install_requires=['requests', 'futures; python_version < "3"'],
+      extras_require={
+          'async': ['aiohttp'],
+          'numpy': ['numpy'],
+          'arrow': ['pyarrow'],
+          'orjson': ['orjson'],
+      },
       include_package_data=True,
       zip_safe=True,
       )
\ No newline at end of file